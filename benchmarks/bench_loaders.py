@@ -0,0 +1,179 @@
+"""Loader + figure benchmarks at increasing synthetic scale.
+
+    python -m benchmarks.bench_loaders --scales 1000000 10000000 --output bench_results.json
+    python -m benchmarks.bench_loaders --baseline old_results.json
+
+For every scale factor the synthetic warehouse is generated once as Parquet fixtures; then each dataset in
+datasets.PANELS (plus the shared bridge extract itself) runs in a fresh process against DuckDBBackend so wall time and
+peak RSS are not polluted by earlier runs; each result also records the frame's in-memory size. Results go to a JSON
+file; --baseline prints every metric that got worse by more than --threshold compared with an earlier results file.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SCALES = [1_000_000, 10_000_000]
+EXTRACT = "bridge_transfers"
+
+
+# --- Memory ---------------------------------------------------------------------------------------------------------
+def _reset_peak_rss():
+    # Linux lets a process reset its own high-water mark, so the peak covers only the measured step.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- Measurement ----------------------------------------------------------------------------------------------------
+def _measure(fixtures, name, out):
+    from bridge_metrics import backends, compact, datasets
+
+    backend = backends.DuckDBBackend(fixtures)
+    read_sql = backend.read_sql
+
+    if name == EXTRACT:
+        _reset_peak_rss()
+        start = time.perf_counter()
+        df = datasets.bridge_transfers(read_sql)
+        result = {"wall_s": time.perf_counter() - start, "figures": 0, "figure_s": 0.0, "serialize_s": 0.0,
+                  "figure_bytes": 0}
+    else:
+        loader, builders = datasets.PANELS[name]
+        transfers = datasets.bridge_transfers(read_sql)
+        _reset_peak_rss()
+        start = time.perf_counter()
+        df = loader(read_sql, transfers)
+        wall = time.perf_counter() - start
+
+        start = time.perf_counter()
+        figures = [build(df) for build in builders]
+        figure_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        payload = sum(len(fig.to_json()) for fig in figures)
+        result = {"wall_s": wall, "figures": len(figures), "figure_s": figure_s,
+                  "serialize_s": time.perf_counter() - start, "figure_bytes": payload}
+
+    result.update(rows=len(df), frame_mb=compact.footprint(df) / 2**20, peak_rss_mb=_peak_rss_mb())
+    out.put(result)
+
+
+def run_one(fixtures, name):
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(fixtures, name, out))
+    proc.start()
+    while True:
+        try:
+            result = out.get(timeout=1)
+            break
+        except queue.Empty:
+            if not proc.is_alive():
+                raise RuntimeError(f"{name} benchmark process exited with code {proc.exitcode}")
+    proc.join()
+    return result
+
+
+# --- Reporting ------------------------------------------------------------------------------------------------------
+def _version():
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    previous = {(r["scale"], r["dataset"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["scale"], r["dataset"]))
+        if old is None:
+            continue
+        for metric in ("wall_s", "figure_s", "serialize_s", "peak_rss_mb", "frame_mb", "figure_bytes"):
+            if old.get(metric) and r[metric] > old[metric] * threshold:
+                regressions.append((r["scale"], r["dataset"], metric, old[metric], r[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="EZ_TOKEN_TRANSFERS row counts to generate (e.g. 1000000 10000000 100000000)")
+    parser.add_argument("--datasets", nargs="+", help="only run these datasets")
+    parser.add_argument("--bridge-share", type=float, default=0.1, help="fraction of transfers on the bridges")
+    parser.add_argument("--workdir", help="where fixtures are generated (default: a temporary directory)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    from benchmarks import synthetic
+    from bridge_metrics import datasets
+
+    names = args.datasets or [EXTRACT, *datasets.PANELS]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bridge-bench-")
+    results = []
+    for scale in args.scales:
+        fixtures = os.path.join(workdir, f"scale-{scale}")
+        if not os.path.isdir(fixtures):
+            start = time.perf_counter()
+            synthetic.generate(fixtures, scale, bridge_share=args.bridge_share)
+            print(f"generated {scale:,} rows in {time.perf_counter() - start:.1f}s", flush=True)
+        for name in names:
+            result = {"scale": scale, "dataset": name, **run_one(fixtures, name)}
+            results.append(result)
+            print(
+                f"{scale:>12,} {name:<36} {result['wall_s']:8.3f}s  fig {result['figure_s']:6.3f}s  "
+                f"json {result['serialize_s']:6.3f}s  {result['peak_rss_mb']:8.1f} MB  "
+                f"{result['rows']:>9,} rows  {result['frame_mb']:8.1f} MiB  {result['figure_bytes']:>11,} B",
+                flush=True
+            )
+
+    report = {
+        "meta": {
+            "version": _version(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "bridge_share": args.bridge_share,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for scale, name, metric, old, new in regressions:
+            print(f"REGRESSION {scale:,} {name} {metric}: {old:.4g} -> {new:.4g}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
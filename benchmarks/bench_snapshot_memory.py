@@ -0,0 +1,100 @@
+"""Compare the host memory of page processes reading a snapshot from Arrow IPC (memory-mapped) and from parquet.
+
+    python -m benchmarks.bench_snapshot_memory --rows 5000000 --processes 8
+    python -m benchmarks.bench_snapshot_memory --fixtures fixtures --processes 4
+
+Builds every panel dataset on DuckDB over synthetic (or existing) fixtures and writes it both ways. For each format,
+--processes processes each load all datasets and read every column, then wait until all of them have, so the
+measurement sees them alive together. Reports the summed growth of Rss and Pss (/proc/self/smaps_rollup; Pss splits
+shared pages between the processes mapping them). Parquet frames are private to each process; IPC frames are views
+of one page-cache copy, so their summed Pss stays near the snapshot size however many processes read it.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bridge_metrics import backends, compact, datasets
+
+
+def _memory():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                fields[key] = int(value.split()[0]) * 1024
+    return fields["Rss"], fields["Pss"]
+
+
+def _load(fmt, paths, loaded, done, results):
+    before = _memory()
+    read = compact.read_ipc if fmt == "arrow" else compact.read_parquet
+    frames = [read(path) for path in paths]
+    for frame in frames:
+        for name in frame.columns:
+            values = frame[name].array
+            if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+                values.sum()
+            else:
+                len(values)
+    loaded.wait()
+    after = _memory()
+    results.put((after[0] - before[0], after[1] - before[1]))
+    done.wait()
+
+
+def measure(fmt, paths, processes):
+    ctx = multiprocessing.get_context("spawn")
+    loaded, done, results = ctx.Barrier(processes), ctx.Barrier(processes), ctx.Queue()
+    workers = [ctx.Process(target=_load, args=(fmt, paths, loaded, done, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    deltas = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return sum(d[0] for d in deltas), sum(d[1] for d in deltas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--users", type=int, help="synthetic distinct wallets (default rows / 20)")
+    parser.add_argument("--processes", type=int, default=4, help="page processes reading the snapshot")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-bench-")
+        synthetic.generate(fixtures, args.rows, users=args.users)
+
+    read_sql = backends.DuckDBBackend(fixtures).read_sql
+    frames = datasets.build_all(read_sql, datasets.bridge_transfers(read_sql))
+    root = tempfile.mkdtemp(prefix="bridge-snapshot-")
+    paths = {"arrow": [], "parquet": []}
+    for name, frame in frames.items():
+        paths["arrow"].append(os.path.join(root, f"{name}.arrow"))
+        compact.write_ipc(frame, paths["arrow"][-1])
+        paths["parquet"].append(os.path.join(root, f"{name}.parquet"))
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), paths["parquet"][-1])
+
+    size = sum(compact.footprint(f) for f in frames.values())
+    print(f"snapshot {len(frames)} datasets  {size / 2**20:.1f} MiB in memory  {args.processes} processes")
+    for fmt, files in paths.items():
+        disk = sum(os.path.getsize(p) for p in files)
+        rss, pss = measure(fmt, files, args.processes)
+        print(f"{fmt:<8} file {disk / 2**20:8.1f} MiB  Rss {rss / 2**20:8.1f} MiB  Pss {pss / 2**20:8.1f} MiB  "
+              f"Pss per process {pss / args.processes / 2**20:7.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
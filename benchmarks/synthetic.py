@@ -0,0 +1,104 @@
+import os
+
+from bridge_metrics import registry
+from bridge_metrics.backends import fixture_path
+
+# Synthetic warehouse tables, generated inside DuckDB and written straight to Parquet fixtures so even the 100M-row
+# scale never materialises in Python. Layout matches backends.DuckDBBackend.
+#
+# EZ_TOKEN_TRANSFERS gets `bridge_share` of its rows on the two Hyperliquid bridges (60% deposits), a slice of
+# stablecoin mints/burns, transfers out of CEX / bridge labelled wallets and plain wallet-to-wallet noise. Timestamps
+# are spread evenly from 2023-03-01 until now, so the last 30 days always hold a depositor cohort.
+
+BRIDGES = [(b["bridge"], b["token_contract"], b["token"]) for b in registry.BRIDGES[:2]]
+ZERO_ADDRESS = registry.ZERO_ADDRESS
+LABELS = 40  # 0x...01-0x...14 are CEX wallets, 0x...15-0x...28 bridges
+
+
+def _address(expr, offset=0):
+    return f"'0x' || lpad(lower(to_hex(({expr}) + {offset})), 40, '0')"
+
+
+def generate(root, rows, bridge_share=0.1, users=None, seed=0):
+    import duckdb
+
+    users = users or max(rows // 20, 100)
+    con = duckdb.connect()
+    con.execute("SET preserve_insertion_order = false")
+    con.execute("SET enable_progress_bar = false")
+
+    def copy(table, select):
+        path = fixture_path(root, table) + ".parquet"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        con.execute(f"COPY ({select}) TO '{path}' (FORMAT parquet)")
+
+    (b1, c1, _), (b2, c2, _) = BRIDGES
+    bridge_cut = int(bridge_share * 10000)
+    user = _address(f"hash(i * 31 + {seed}) % {users}", LABELS + 1)
+    label = _address(f"hash(i * 17 + {seed}) % {LABELS}", 1)
+
+    copy("ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS", f"""
+        SELECT
+          i AS block_number,
+          TIMESTAMP '2023-03-01' + to_seconds(CAST(i * span // {rows} AS BIGINT)) AS block_timestamp,
+          '0x' || lpad(lower(to_hex(i)), 64, '0') AS tx_hash,
+          0 AS event_index,
+          CASE
+            WHEN r < {bridge_cut} AND r % 10 < 6 THEN {user}
+            WHEN r < {bridge_cut} THEN CASE WHEN r % 2 = 0 THEN '{b1}' ELSE '{b2}' END
+            WHEN r < {bridge_cut} + 200 THEN '{ZERO_ADDRESS}'
+            WHEN r < {bridge_cut} + 1200 THEN {label}
+            ELSE {user}
+          END AS from_address,
+          CASE
+            WHEN r < {bridge_cut} AND r % 10 < 6 THEN CASE WHEN r % 2 = 0 THEN '{b1}' ELSE '{b2}' END
+            WHEN r < {bridge_cut} + 300 AND r >= {bridge_cut} + 200 THEN '{ZERO_ADDRESS}'
+            ELSE {_address(f"hash(i * 37 + {seed}) % {users}", LABELS + 1)}
+          END AS to_address,
+          CASE
+            WHEN r < {bridge_cut} THEN CASE WHEN r % 2 = 0 THEN '{c1}' ELSE '{c2}' END
+            WHEN r % 4 = 0 THEN '{c1}'
+            WHEN r % 4 = 1 THEN '{c2}'
+            WHEN r % 4 = 2 THEN '{registry.STABLECOINS[1]}'
+            ELSE '{registry.STABLECOINS[3]}'
+          END AS contract_address,
+          CASE WHEN r % 2 = 0 THEN 'USDC.e' ELSE 'USDC' END AS symbol,
+          round(exp((hash(i * 7 + {seed}) % 1100) / 100.0), 2) AS amount
+        FROM (
+          SELECT i, hash(i + {seed}) % 10000 AS r, epoch(now()) - epoch(TIMESTAMP '2023-03-01') AS span
+          FROM range({rows}) t(i)
+        )
+    """)
+
+    copy("ARBITRUM_ONCHAIN_CORE_DATA.CORE.FACT_TRANSACTIONS", f"""
+        SELECT
+          i AS block_number,
+          TIMESTAMP '2023-03-01' + to_seconds(CAST(hash(i * 3 + {seed}) % CAST(span AS BIGINT) AS BIGINT))
+            AS block_timestamp,
+          '0x' || lpad(lower(to_hex(i)), 64, '0') AS tx_hash,
+          {user} AS from_address,
+          {_address(f"hash(i * 41 + {seed}) % {users}", LABELS + 1)} AS to_address
+        FROM (SELECT i, epoch(now()) - epoch(TIMESTAMP '2023-03-01') AS span FROM range({max(rows // 10, 1)}) t(i))
+    """)
+
+    copy("ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS", f"""
+        SELECT
+          i AS block_number,
+          TIMESTAMP '2023-03-01' + to_seconds(CAST(hash(i * 5 + {seed}) % CAST(span AS BIGINT) AS BIGINT))
+            AS block_timestamp,
+          '0x' || lpad(lower(to_hex(i)), 64, '0') AS tx_hash,
+          {label} AS from_address,
+          {user} AS to_address,
+          1.0 AS amount
+        FROM (SELECT i, epoch(now()) - epoch(TIMESTAMP '2023-03-01') AS span FROM range({max(rows // 20, 1)}) t(i))
+    """)
+
+    copy("ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS", f"""
+        SELECT
+          {_address("i", 1)} AS address,
+          CASE WHEN i < {LABELS // 2} THEN 'cex' ELSE 'bridge' END AS label_type,
+          'hot_wallet' AS label_subtype,
+          'synthetic' AS label
+        FROM range({LABELS}) t(i)
+    """)
+    con.close()
@@ -0,0 +1,111 @@
+"""Check the depositor index against the per-wallet groupbys it replaces, and report its size and timings.
+
+    python -m benchmarks.verify_depositors --rows 20000000 --users 2000000
+    python -m benchmarks.verify_depositors --fixtures fixtures --batches 10
+
+Loads the bridge extract on DuckDB over synthetic (or existing) fixtures and folds it into a DepositorIndex in
+--batches incremental updates, as the refresh worker does. Total depositors, new depositors per day and the 30-day
+cohort served from the index (after re-opening it memory-mapped) are compared with the per-wallet groupbys the
+dashboard used to run over the whole extract. Reports the index footprint on disk and the time of each path; exits
+non-zero on any mismatch.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import backends, compact, datasets, depositors, transforms
+
+
+# --- Per-wallet Groupbys --------------------------------------------------------------------------------------------
+def first_deposit_days(transfers):
+    return transforms.deposits(transfers).groupby("USER_ADDRESS")["DAY"].min()
+
+
+def new_depositors_over_time(transfers):
+    counts = first_deposit_days(transfers).value_counts().sort_index()
+    df = pd.DataFrame({
+        "DAY": counts.index,
+        "NEW_DEPOSITORS": counts.to_numpy(),
+        "TOTAL_DEPOSITORS": counts.cumsum().to_numpy(),
+    })
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def total_depositors(transfers):
+    return pd.DataFrame({"TOTAL_DEPOSITORS": [transforms.deposits(transfers)["USER_ADDRESS"].nunique()]})
+
+
+def new_depositor_cohort(transfers, days=30, today=None):
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+    grouped = transforms.deposits(transfers).groupby("USER_ADDRESS")
+    cohort = pd.DataFrame({
+        "FIRST_DEPOSIT_DAY": grouped["DAY"].min(),
+        "DEPOSIT_VOLUME": grouped["AMOUNT"].sum(),
+    })
+    cohort = cohort[cohort["FIRST_DEPOSIT_DAY"] >= today - pd.Timedelta(days=days)]
+    # The extract holds addresses as raw bytes; the cohort carries them as hex, like the warehouse.
+    cohort.index = compact.hex_strings(compact.fixed_bytes(cohort.index.to_series()))
+    return cohort.rename_axis("USER1").reset_index()
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - start) * 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--users", type=int, help="synthetic distinct wallets (default rows / 20)")
+    parser.add_argument("--batches", type=int, default=5, help="incremental updates to fold the extract in")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows, users=args.users)
+
+    transfers = datasets.bridge_transfers(backends.DuckDBBackend(fixtures).read_sql)
+    root = tempfile.mkdtemp(prefix="bridge-depositors-")
+    index = depositors.DepositorIndex(root)
+    for end in np.linspace(0, len(transfers), args.batches + 1).astype("int64")[1:]:
+        _, ms = _timed(index.update, transfers.iloc[:end])
+        print(f"update to {end:>12,} rows  {ms:9.1f}ms  wallets {len(index.wallets()):>10,}")
+
+    index = depositors.DepositorIndex(root)
+    today = transfers["DAY"].max()
+    checks = [
+        ("total depositors", lambda: index.total_depositors(), lambda: total_depositors(transfers)),
+        ("new depositors", lambda: index.new_depositors_over_time(), lambda: new_depositors_over_time(transfers)),
+        ("30-day cohort", lambda: index.cohort(today=today), lambda: new_depositor_cohort(transfers, today=today)),
+    ]
+    failed = 0
+    for name, indexed, exact in checks:
+        got, index_ms = _timed(indexed)
+        want, exact_ms = _timed(exact)
+        same = got.shape == want.shape and all(
+            np.allclose(got[c], want[c]) if got[c].dtype.kind == "f"
+            else (got[c].to_numpy() == want[c].to_numpy()).all()
+            for c in want.columns
+        )
+        failed += not same
+        print(f"{name:<18} rows {len(got):>8,}  index {index_ms:8.1f}ms  groupby {exact_ms:8.1f}ms  "
+              f"{'ok' if same else 'MISMATCH'}")
+
+    disk = sum(os.path.getsize(os.path.join(root, f)) for f in os.listdir(root))
+    print(f"index {len(index.wallets()):,} wallets  {index.nbytes() / 2**20:.1f} MiB in memory  "
+          f"{disk / 2**20:.1f} MiB on disk")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
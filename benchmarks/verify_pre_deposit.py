@@ -0,0 +1,304 @@
+"""Check the pre-deposit activity classifier against the query it replaced.
+
+    python -m benchmarks.verify_pre_deposit --rows 1000000
+    python -m benchmarks.verify_pre_deposit --fixtures fixtures
+
+Runs the old SQL, the first SQL rewrite and the local label-index classification on DuckDB over synthetic (or
+existing) fixtures for the same 30-day depositor cohort, compares the bucket assigned to every wallet, and reports how
+many rows each SQL version builds before its final GROUP BY. Exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from bridge_metrics import backends, depositors, labels, queries, transforms
+
+TOKEN_TRANSFERS = "ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS"
+NATIVE_TRANSFERS = "ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS"
+
+# Inflow offsets from the first deposit day around both window edges: DATEDIFF(hour, ...) is -25 / -24 and 24 / 25.
+EDGE_OFFSETS = [
+    pd.Timedelta(hours=-24, seconds=-1), pd.Timedelta(hours=-24), pd.Timedelta(0),
+    pd.Timedelta(hours=25, seconds=-1), pd.Timedelta(hours=25), pd.Timedelta(days=3),
+]
+
+# The classifier as it ran on the dashboard before the rewrite: tab3 repeats the CEX subquery, and the cohort is
+# LEFT JOINed to all three unaggregated inflow streams before grouping.
+_LEGACY_CTES = """
+with tab1 as (
+  SELECT user1, first_deposit_day, deposit_volume FROM depositor_cohort
+), tab2 as (
+  SELECT
+    receiver,
+    block_timestamp
+  FROM AXELAR.DEFI.EZ_BRIDGE_SQUID
+  WHERE DESTINATION_CHAIN LIKE 'arbitrum'
+  AND receiver in (SELECT user1 from tab1)
+), tab3 as (
+  SELECT
+    to_address,
+    block_timestamp as bt1
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+  WHERE from_address in (
+    SELECT
+      DISTINCT address
+    FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS
+    WHERE label_type LIKE 'cex'
+  )
+  UNION all
+  SELECT
+    to_address,
+    block_timestamp as bt1
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+  WHERE from_address in (
+    SELECT
+      DISTINCT address
+    FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS
+    WHERE label_type LIKE 'cex'
+  )
+), tab4 as (
+  SELECT
+    to_address as ta,
+    block_timestamp as bt2
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS
+  WHERE from_address in (
+    SELECT
+      DISTINCT address
+    FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS
+    WHERE label_type LIKE 'bridge'
+  )
+  UNION all
+  SELECT
+    to_address as ta,
+    block_timestamp as bt2
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+  WHERE from_address in (
+    SELECT
+      DISTINCT address
+    FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS
+    WHERE label_type LIKE 'bridge'
+  )
+)
+"""
+
+
+def legacy_wallet_types_sql():
+    return _LEGACY_CTES + """
+SELECT
+  user1,
+  deposit_volume,
+  CASE
+    when WALLET_TYPE3 > 0 then 'a/ Pre-Deposit Bridge'
+    when WALLET_TYPE2 > 0 then 'b/ Pre-Deposit Cex Transfer'
+    else 'c/ Other wallet'
+  end as wallet_type
+FROM (
+  SELECT
+    user1,
+    deposit_volume,
+    sum(CASE when ABS(DATEDIFF(hour, first_deposit_day, block_timestamp)) <= 24 then 1 else 0 end) as wallet_type1,
+    sum(CASE when ABS(DATEDIFF(hour, first_deposit_day, bt1)) <= 24 then 1 else 0 end) as wallet_type2,
+    sum(CASE when ABS(DATEDIFF(hour, first_deposit_day, bt2)) <= 24 then 1 else 0 end) as wallet_type3
+  FROM tab1
+    LEFT outer JOIN tab2
+      on user1 = receiver
+    LEFT outer JOIN tab3
+      on user1 = to_address
+    LEFT outer JOIN tab4
+      on user1 = ta
+  GROUP BY 1,2
+)
+"""
+
+
+def legacy_join_rows_sql():
+    return _LEGACY_CTES + """
+SELECT count(*) as rows
+FROM tab1
+  LEFT outer JOIN tab2
+    on user1 = receiver
+  LEFT outer JOIN tab3
+    on user1 = to_address
+  LEFT outer JOIN tab4
+    on user1 = ta
+"""
+
+
+# The first rewrite, still in SQL: a wallet is "Pre-Deposit Bridge" / "Pre-Deposit Cex Transfer" when it received
+# anything from a bridge / CEX labelled address within 24h either side of its first deposit day. The check is an
+# existence test per wallet: inflows are semi-joined to the cohort first, matched on a sargable window and reduced to
+# one row per wallet before the cohort is joined back, so busy wallets never multiply rows.
+def pre_deposit_wallet_types_sql():
+    return f"""
+    with tab1 as (
+  SELECT user1, first_deposit_day, deposit_volume FROM {queries.COHORT_TABLE}
+), bridge_inflows as (
+  SELECT
+    to_address,
+    block_timestamp
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS
+  WHERE from_address in (
+    SELECT address FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS WHERE label_type LIKE 'bridge'
+  )
+  AND to_address in (SELECT user1 from tab1)
+  UNION all
+  SELECT
+    to_address,
+    block_timestamp
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+  WHERE from_address in (
+    SELECT address FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS WHERE label_type LIKE 'bridge'
+  )
+  AND to_address in (SELECT user1 from tab1)
+), cex_inflows as (
+  SELECT
+    to_address,
+    block_timestamp
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+  WHERE from_address in (
+    SELECT address FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS WHERE label_type LIKE 'cex'
+  )
+  AND to_address in (SELECT user1 from tab1)
+), pre_deposit_bridge as (
+  SELECT DISTINCT user1
+  FROM tab1
+    JOIN bridge_inflows
+      on user1 = to_address
+      and block_timestamp >= DATEADD(hour, -24, first_deposit_day)
+      and block_timestamp < DATEADD(hour, 25, first_deposit_day)
+), pre_deposit_cex as (
+  SELECT DISTINCT user1
+  FROM tab1
+    JOIN cex_inflows
+      on user1 = to_address
+      and block_timestamp >= DATEADD(hour, -24, first_deposit_day)
+      and block_timestamp < DATEADD(hour, 25, first_deposit_day)
+)
+SELECT
+  tab1.user1,
+  tab1.deposit_volume,
+  CASE
+    when pre_deposit_bridge.user1 is not null then 'a/ Pre-Deposit Bridge'
+    when pre_deposit_cex.user1 is not null then 'b/ Pre-Deposit Cex Transfer'
+    else 'c/ Other wallet'
+  end as wallet_type
+FROM tab1
+  LEFT outer JOIN pre_deposit_bridge
+    on tab1.user1 = pre_deposit_bridge.user1
+  LEFT outer JOIN pre_deposit_cex
+    on tab1.user1 = pre_deposit_cex.user1
+    """
+
+
+def rewrite_rows_sql():
+    # Rows the rewrite materialises: semi-joined inflows, their in-window matches, then one row per cohort wallet.
+    base = pre_deposit_wallet_types_sql().rsplit("SELECT\n  tab1.user1", 1)[0]
+    return base + """
+SELECT
+  (SELECT count(*) FROM bridge_inflows) + (SELECT count(*) FROM cex_inflows) as inflow_rows,
+  (SELECT count(*) FROM pre_deposit_bridge) + (SELECT count(*) FROM pre_deposit_cex) as matched_rows,
+  (SELECT count(*) FROM tab1) as cohort_rows
+"""
+
+
+def inject_edge_cases(backend, cohort, copies=3):
+    # Synthetic data rarely lands an inflow near a first deposit, so every cohort wallet gets CEX / bridge inflows
+    # (token and native) at one of EDGE_OFFSETS, repeated `copies` times to exercise the legacy fan-out.
+    labels = backend.read_sql(
+        "SELECT label_type, min(address) as address FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS "
+        "WHERE label_type in ('cex', 'bridge') GROUP BY 1"
+    )
+    source = dict(zip(labels["LABEL_TYPE"], labels["ADDRESS"]))
+    token, native = [], []
+    for i, (user, day) in enumerate(zip(cohort["USER1"], cohort["FIRST_DEPOSIT_DAY"])):
+        kind = ("cex", "bridge", "bridge-native", None)[i % 4]
+        if kind is None or kind.split("-")[0] not in source:
+            continue
+        when = pd.Timestamp(day) + EDGE_OFFSETS[(i // 4) % len(EDGE_OFFSETS)]
+        row = {"block_number": -1, "block_timestamp": when, "tx_hash": f"0xverify{i:058x}",
+               "from_address": source[kind.split("-")[0]], "to_address": user, "amount": 1.0}
+        if kind == "bridge-native":
+            native.extend([row] * copies)
+        else:
+            token.extend([{**row, "event_index": 0, "contract_address": "", "symbol": ""}] * copies)
+
+    for table, rows in ((TOKEN_TRANSFERS, token), (NATIVE_TRANSFERS, native)):
+        if rows:
+            existing = backend.read_sql(f"SELECT * FROM {table}")
+            existing.columns = existing.columns.str.lower()
+            backend.register(table, pd.concat([existing, pd.DataFrame(rows)[existing.columns]], ignore_index=True))
+    return len(token) + len(native)
+
+
+def _timed(read_sql, query, **kwargs):
+    start = time.perf_counter()
+    df = read_sql(query, **kwargs)
+    return df, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--days", type=int, default=30, help="cohort window in days")
+    parser.add_argument("--no-edge-cases", action="store_true", help="do not inject inflows at the window edges")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows)
+
+    backend = backends.DuckDBBackend(fixtures)
+    read_sql = backend.read_sql
+    transfers = transforms.prepare_transfers(read_sql(queries.BRIDGE_TRANSFERS_QUERY))
+    index = depositors.DepositorIndex()
+    index.update(transfers)
+    cohort = index.cohort(days=args.days)
+    if cohort.empty:
+        print("empty depositor cohort, nothing to compare")
+        return 1
+    if not args.no_edge_cases:
+        print(f"injected inflows      {inject_edge_cases(backend, cohort):>14,}")
+    tables = {queries.COHORT_TABLE: queries.cohort_table(cohort)}
+
+    legacy, legacy_s = _timed(read_sql, legacy_wallet_types_sql(), tables=tables)
+    rewrite, rewrite_s = _timed(read_sql, pre_deposit_wallet_types_sql(), tables=tables)
+    start = time.perf_counter()
+    senders = read_sql(queries.pre_deposit_senders_query(cohort), tables=tables)
+    local = transforms.pre_deposit_wallet_types(cohort, senders, labels.LabelIndex().refresh(read_sql))
+    local_s = time.perf_counter() - start
+
+    mismatched = []
+    for name, other in (("rewrite", rewrite), ("label index", local)):
+        merged = legacy.merge(other, on="USER1", how="outer", suffixes=("_LEGACY", "_OTHER"), indicator=True)
+        bad = merged[(merged["_merge"] != "both") | (merged["WALLET_TYPE_LEGACY"] != merged["WALLET_TYPE_OTHER"])]
+        if len(bad):
+            print(f"MISMATCH ({name}): {len(bad):,} wallets classified differently")
+            print(bad.head(20).to_string())
+            mismatched.append(name)
+
+    print(f"cohort wallets        {len(cohort):>14,}")
+    print("buckets               " + ", ".join(
+        f"{bucket}: {count:,}" for bucket, count in rewrite["WALLET_TYPE"].value_counts().sort_index().items()
+    ))
+    print(f"legacy   {legacy_s:8.3f}s  rows before GROUP BY "
+          f"{read_sql(legacy_join_rows_sql(), tables=tables)['ROWS'][0]:>14,}")
+    counts = read_sql(rewrite_rows_sql(), tables=tables).iloc[0]
+    print(f"rewrite  {rewrite_s:8.3f}s  inflow rows {counts['INFLOW_ROWS']:>14,}  in-window matches "
+          f"{counts['MATCHED_ROWS']:>10,}  final join rows {counts['COHORT_ROWS']:>10,}")
+    print(f"label index {local_s:5.3f}s  sender rows {len(senders):>14,}")
+
+    if mismatched:
+        return 1
+    print("bucket assignments match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Check the deposit-size quantile sketches against exact order statistics and time range merges.
+
+    python -m benchmarks.verify_quantiles --rows 1000000
+    python -m benchmarks.verify_quantiles --fixtures fixtures --ranges 50
+
+Builds the per-day quantile sketches from the bridge extract on DuckDB over synthetic (or existing) fixtures, then
+compares the median, p90, p99 and p999 of deposits and withdrawals, over all days and over random date ranges and
+token selections, with the exact order statistics from the same extract. A sketched quantile is accepted when it is
+within the sketch's relative accuracy of the amount at rank floor(q * (n - 1)) or the one after it. Reports the
+worst relative error and the time each merge takes, and exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import backends, datasets, quantiles, registry
+
+QS = [0.5, 0.9, 0.99, 0.999]
+
+
+def exact_bounds(transfers, direction, start=None, end=None, tokens=None):
+    # The two order statistics around each quantile's rank.
+    selected = transfers["DIRECTION"].to_numpy() == direction
+    if start is not None:
+        selected &= ((transfers["DAY"] >= start) & (transfers["DAY"] <= end)).to_numpy()
+    if tokens is not None:
+        selected &= transfers["TOKEN"].isin(tokens).to_numpy()
+    amounts = np.sort(transfers["AMOUNT"].to_numpy()[selected])
+    if not len(amounts):
+        return None, None
+    ranks = np.floor(np.asarray(QS) * (len(amounts) - 1)).astype("int64")
+    return amounts[ranks], amounts[np.minimum(ranks + 1, len(amounts) - 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--ranges", type=int, default=20, help="random date range / token selections to check")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows)
+
+    read_sql = backends.DuckDBBackend(fixtures).read_sql
+    transfers = datasets.bridge_transfers(read_sql)
+    start = time.perf_counter()
+    frame = quantiles.sketch(transfers)
+    print(f"extract rows {len(transfers):>12,}  sketch rows {len(frame):>8,}  "
+          f"built in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(0)
+    first, last = transfers["DAY"].min(), transfers["DAY"].max()
+    tokens = list(dict.fromkeys(b["token"] for b in registry.BRIDGES))
+    checks = [(direction, None, None, None) for direction in ("Deposit", "Withdraw")]
+    for _ in range(args.ranges):
+        a, b = sorted(rng.integers(0, (last - first).days + 1, 2))
+        picked = [t for t in tokens if rng.random() < 0.7] or tokens
+        checks.append((rng.choice(["Deposit", "Withdraw"]), first + pd.Timedelta(days=int(a)),
+                       first + pd.Timedelta(days=int(b)), picked))
+
+    tolerance = quantiles.RELATIVE_ACCURACY * (1 + 1e-9)
+    failed = 0
+    for direction, lo, hi, picked in checks:
+        start = time.perf_counter()
+        sketched = quantiles.quantiles(frame, QS, lo, hi, picked, direction=direction).to_numpy()
+        merge_ms = (time.perf_counter() - start) * 1e3
+        lower, upper = exact_bounds(transfers, direction, lo, hi, picked)
+        span = "all days" if lo is None else f"{lo:%Y-%m-%d}..{hi:%Y-%m-%d} {','.join(picked)}"
+        if lower is None:
+            failed += int(np.isfinite(sketched).sum())
+            print(f"{direction:<8} {span:<36} no transfers")
+            continue
+        errors = np.minimum(np.abs(sketched - lower) / np.maximum(lower, 1e-12),
+                            np.abs(sketched - upper) / np.maximum(upper, 1e-12))
+        failed += int((errors > tolerance).sum())
+        print(f"{direction:<8} {span:<36} merge {merge_ms:6.1f}ms  "
+              + "  ".join(f"p{q * 100:g} {value:,.2f}" for q, value in zip(QS, sketched))
+              + f"  max error {errors.max():.4f}")
+
+    if failed:
+        print(f"MISMATCH: {failed:,} quantiles off by more than {quantiles.RELATIVE_ACCURACY:.2%}")
+        return 1
+    print(f"all quantiles within {quantiles.RELATIVE_ACCURACY:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Check the cohort retention matrix against a plain pandas groupby and time it over the full history.
+
+    python -m benchmarks.verify_retention --rows 20000000 --users 2000000
+    python -m benchmarks.verify_retention --fixtures fixtures
+
+Loads the bridge extract on DuckDB over synthetic (or existing) fixtures, builds the weekly and monthly retention
+frames, and compares every cohort x age count with one computed by grouping distinct wallet / period rows per first
+deposit period, plus a hand-built case with a withdrawal before any deposit. Exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bridge_metrics import backends, datasets, retention, transforms
+
+
+def exact_retention(transfers, freq):
+    # Wallets per (COHORT, AGE), from distinct wallet / period rows and each wallet's first deposit period.
+    rows = transfers.assign(PERIOD=transforms.period_start(transfers["DAY"], freq))
+    first = transforms.deposits(rows).groupby("USER_ADDRESS")["PERIOD"].min()
+    active = rows[["USER_ADDRESS", "PERIOD"]].drop_duplicates()
+    active = active.assign(COHORT=active["USER_ADDRESS"].map(first)).dropna(subset=["COHORT"])
+    if freq == "M":
+        age = (active["PERIOD"].dt.year - active["COHORT"].dt.year) * 12 + active["PERIOD"].dt.month \
+            - active["COHORT"].dt.month
+    else:
+        age = (active["PERIOD"] - active["COHORT"]).dt.days // 7
+    active = active.assign(AGE=age)
+    active = active[active["AGE"] >= 0]
+    return active.groupby([active["COHORT"].astype("datetime64[ns]"), "AGE"]).size()
+
+
+def check_early_events():
+    # A withdrawal before the first deposit period must not be credited to another wallet: wallet 1 withdraws in
+    # period 0, wallet 0 deposits in period 1, wallet 1 deposits in period 2. Each is only in its own cohort at age 0.
+    periods, cells = retention.retention_matrix(
+        np.array([1, 0, 1]), 2, np.array([0, 1, 2]), np.array([False, True, True])
+    )
+    return periods.tolist() == [1, 2] and cells.tolist() == [[1, 0], [1, 0]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--users", type=int, help="synthetic distinct wallets (default rows / 20)")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows, users=args.users)
+
+    transfers = datasets.bridge_transfers(backends.DuckDBBackend(fixtures).read_sql)
+    print(f"extract rows {len(transfers):>12,}  wallets {transfers['USER_ADDRESS'].nunique():>10,}")
+
+    failed = not check_early_events()
+    print(f"events before the first deposit period  {'MISMATCH' if failed else 'ok'}")
+    for freq, name in retention.PERIODS.items():
+        start = time.perf_counter()
+        frame = retention.cohort_retention(transfers, [freq])
+        matrix_ms = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        exact = exact_retention(transfers, freq)
+        exact_ms = (time.perf_counter() - start) * 1e3
+
+        got = frame[frame["WALLETS"] > 0].set_index(["COHORT", "AGE"])["WALLETS"]
+        same = got.sort_index().equals(exact.sort_index().astype(got.dtype))
+        failed += not same
+        cohorts = frame.loc[frame["AGE"] == 0]
+        print(f"{name:<8} cohorts {len(cohorts):>5,}  cells {len(frame):>8,}  "
+              f"depositors {cohorts['WALLETS'].sum():>10,}  matrix {matrix_ms:8.1f}ms  groupby {exact_ms:9.1f}ms  "
+              f"{'ok' if same else 'MISMATCH'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Check the distinct-count sketches against exact counts and time granularity changes.
+
+    python -m benchmarks.verify_sketches --rows 1000000
+    python -m benchmarks.verify_sketches --fixtures fixtures --ranges 50
+
+Builds the per-day sketches from the bridge extract on DuckDB over synthetic (or existing) fixtures, then compares
+unique users / events per day, week and month, and over random date ranges and token selections, with exact
+distinct counts from the same extract. Reports the error distribution and the time each merge takes. Exits non-zero
+when a count is off by more than --max-error (default 4 standard errors of the sketch) plus 2: small counts are
+dominated by single register collisions.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import backends, datasets, registry, sketches, transforms
+
+
+def exact_counts(transfers, freq, start=None, end=None, tokens=None):
+    period = sketches.PERIOD_COLUMNS[freq]
+    day = transfers["DAY"]
+    selected = np.ones(len(transfers), dtype=bool)
+    if start is not None:
+        selected &= ((day >= start) & (day <= end)).to_numpy()
+    if tokens is not None:
+        selected &= transfers["TOKEN"].isin(tokens).to_numpy()
+    rows = transfers[selected]
+    grouped = rows.assign(**{period: transforms.period_start(rows["DAY"], freq), "ACTION_TYPE": rows["DIRECTION"]})
+    grouped = grouped.groupby([period, "ACTION_TYPE"], sort=True)
+    return pd.DataFrame({
+        "USERS": grouped["USER_ADDRESS"].nunique(),
+        "EVENTS": grouped["TX_HASH"].nunique(),
+    }).reset_index()
+
+
+def _errors(exact, sketched, period, max_error):
+    merged = exact.merge(sketched, on=[period, "ACTION_TYPE"], how="outer", suffixes=("_EXACT", "_SKETCH"))
+    merged = merged.fillna(0)
+    errors, excess = [], []
+    for column in sketches.COUNTS:
+        truth = merged[f"{column}_EXACT"].to_numpy(dtype="float64")
+        off = np.abs(merged[f"{column}_SKETCH"].to_numpy(dtype="float64") - truth)
+        errors.append(off / np.maximum(truth, 1))
+        excess.append(off - 2 - max_error * truth)
+    return np.concatenate(errors), np.concatenate(excess)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--ranges", type=int, default=20, help="random date range / token selections to check")
+    parser.add_argument("--max-error", type=float, default=4 * 1.04 / np.sqrt(sketches.REGISTERS),
+                        help="largest relative error accepted")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows)
+
+    read_sql = backends.DuckDBBackend(fixtures).read_sql
+    transfers = datasets.bridge_transfers(read_sql)
+    start = time.perf_counter()
+    frame = sketches.sketch(transfers)
+    print(f"extract rows {len(transfers):>12,}  sketches {len(frame):>8,}  built in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(0)
+    first, last = transfers["DAY"].min(), transfers["DAY"].max()
+    tokens = list(dict.fromkeys(b["token"] for b in registry.BRIDGES))
+    checks = [(freq, None, None, None) for freq in sketches.PERIOD_COLUMNS]
+    for _ in range(args.ranges):
+        a, b = sorted(rng.integers(0, (last - first).days + 1, 2))
+        picked = [t for t in tokens if rng.random() < 0.7] or tokens
+        checks.append((rng.choice(list(sketches.PERIOD_COLUMNS)), first + pd.Timedelta(days=int(a)),
+                       first + pd.Timedelta(days=int(b)), picked))
+
+    failed = 0
+    for freq, lo, hi, picked in checks:
+        start = time.perf_counter()
+        sketched = sketches.distinct_counts(frame, freq, lo, hi, picked)
+        sketch_ms = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        exact = exact_counts(transfers, freq, lo, hi, picked)
+        exact_ms = (time.perf_counter() - start) * 1e3
+        errors, excess = _errors(exact, sketched, sketches.PERIOD_COLUMNS[freq], args.max_error)
+        failed += int((excess > 0).sum())
+        span = "all days" if lo is None else f"{lo:%Y-%m-%d}..{hi:%Y-%m-%d} {','.join(picked)}"
+        print(f"{freq} {span:<36} periods {len(sketched):>5,}  merge {sketch_ms:7.1f}ms  exact {exact_ms:7.1f}ms  "
+              f"error mean {errors.mean() if len(errors) else 0:.4f} max {errors.max(initial=0):.4f}")
+
+    if failed:
+        print(f"MISMATCH: {failed:,} counts off by more than {args.max_error:.4f} relative + 2")
+        return 1
+    print(f"all counts within {args.max_error:.4f} relative + 2")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Check the incremental stablecoin supply ledger against the query it replaced.
+
+    python -m benchmarks.verify_supply --rows 1000000
+    python -m benchmarks.verify_supply --fixtures fixtures --steps 12
+
+Runs the old full-history supply SQL on DuckDB over synthetic (or existing) fixtures, then builds the ledger in
+`--steps` refreshes: each one only sees transfers up to a later cut-off day, the way new days arrive in production,
+and fetches from the ledger's last stored day on. Compares the daily supply series and reports rows scanned per
+refresh. Exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import backends, registry, supply
+from bridge_metrics.queries import _in, _quote
+
+TOKEN_TRANSFERS = "ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS"
+
+# The supply query as it ran on every Row 1 load before the ledger.
+LEGACY_SUPPLY_SQL = f"""
+SELECT
+  date as d1,
+  sum(supply) as stablecoin_suppy
+
+FROM (
+SELECT
+  date,
+  symbol,
+  sum(case when type like 'mint' then amount when type like 'burn' then -amount else 0 end) as net_mint,
+  sum(net_mint) over (partition by symbol order by date) as supply
+
+from (
+  SELECT
+    date(block_timestamp) date,
+    case when from_address = {_quote(registry.ZERO_ADDRESS)} then 'mint'
+    when to_address = {_quote(registry.ZERO_ADDRESS)} then 'burn' else 'otehr' end as type,
+    SYMBOL,
+    amount
+
+  from {TOKEN_TRANSFERS}
+  where {_in("contract_address", registry.STABLECOINS)}
+)
+GROUP BY 1,2)
+GROUP by 1
+"""
+
+
+def _until(read_sql, cutoff):
+    # The warehouse as of `cutoff`: transfers after that day have not happened yet.
+    def read(query):
+        return read_sql(query.replace(TOKEN_TRANSFERS, f"(SELECT * FROM {TOKEN_TRANSFERS} "
+                                                       f"WHERE block_timestamp < '{cutoff:%Y-%m-%d}')"))
+    return read
+
+
+def _scanned_rows(read_sql, since):
+    where = _in("contract_address", registry.STABLECOINS)
+    if since is not None:
+        where += f" AND block_timestamp >= '{pd.Timestamp(since):%Y-%m-%d}'"
+    return int(read_sql(f"SELECT count(*) AS n FROM {TOKEN_TRANSFERS} WHERE {where}")["N"][0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="existing fixtures directory (default: generate synthetic data)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic EZ_TOKEN_TRANSFERS rows")
+    parser.add_argument("--steps", type=int, default=8, help="incremental refreshes to build the ledger in")
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures
+    if fixtures is None:
+        from benchmarks import synthetic
+
+        fixtures = tempfile.mkdtemp(prefix="bridge-verify-")
+        synthetic.generate(fixtures, args.rows)
+
+    read_sql = backends.DuckDBBackend(fixtures).read_sql
+    start = time.perf_counter()
+    legacy = read_sql(LEGACY_SUPPLY_SQL)
+    legacy_s = time.perf_counter() - start
+    legacy.columns = [c.upper() for c in legacy.columns]
+    legacy = legacy.assign(D1=pd.to_datetime(legacy["D1"]).astype("datetime64[ns]"))
+    legacy = legacy.sort_values("D1").reset_index(drop=True)
+    if legacy.empty:
+        print("no stablecoin transfers, nothing to compare")
+        return 1
+
+    ledger = supply.SupplyLedger(tempfile.mkdtemp(prefix="bridge-supply-"))
+    first, last = legacy["D1"].min(), legacy["D1"].max() + pd.Timedelta(days=1)
+    cutoffs = pd.date_range(first, last, periods=args.steps + 1)[1:].normalize()
+    cutoffs = cutoffs.append(pd.DatetimeIndex([last])).unique()
+    for cutoff in cutoffs:
+        since = ledger.through()
+        scanned = _scanned_rows(_until(read_sql, cutoff), since)
+        start = time.perf_counter()
+        ledger.refresh(_until(read_sql, cutoff))
+        print(f"refresh through {cutoff:%Y-%m-%d}  since {since or '-':>10}  {time.perf_counter() - start:7.3f}s  "
+              f"rows scanned {scanned:>12,}")
+
+    local = ledger.supply()
+    print(f"legacy   {legacy_s:8.3f}s  rows scanned {_scanned_rows(read_sql, None):>12,}")
+    print(f"ledger rows {len(ledger.ledger()):>10,}  days {len(local):>6,}")
+
+    same_days = local["D1"].reset_index(drop=True).equals(legacy["D1"])
+    close = same_days and np.allclose(
+        local["STABLECOIN_SUPPY"].to_numpy(), legacy["STABLECOIN_SUPPY"].to_numpy(dtype="float64"), rtol=1e-9
+    )
+    if not close:
+        merged = legacy.merge(local, on="D1", how="outer", suffixes=("_LEGACY", "_LEDGER"))
+        print("MISMATCH: daily supply differs")
+        print(merged.head(20).to_string())
+        return 1
+    print("daily supply matches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
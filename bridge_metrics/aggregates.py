@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from bridge_metrics import files, transforms
+
+# Month-partitioned daily flow aggregates behind the sidebar date-range / token filters.
+#
+#   <root>/month=<YYYY-MM>.parquet   DAY x TOKEN x DIRECTION x DEPOSIT_SIZE -> EVENTS, VOLUME
+#   <root>/meta.json                 {"final": [<YYYY-MM>, ...], "updated": <unix time>}
+#   <root>/lock                      flock()ed exclusive by updates, shared by readers
+#
+# Every row is additive, so any date range / token selection is answered by concatenating partitions and filtering.
+# A month becomes final once the extract it was built from holds blocks more than FINAL_AFTER past its end (blocks
+# arrive in order, so nothing can land in it any more); after that its partition is never rebuilt. It is measured on
+# the data rather than the clock, so an extract that lags (stalled refreshes, a slow warehouse feed) never finalises
+# a month it has not fully seen. Only missing months and the still open ones are
+# recomputed from the bridge extract on each refresh.
+
+FINAL_AFTER = pd.Timedelta(days=2)
+FLOW_COLUMNS = ["DAY", "TOKEN", "DIRECTION", "DEPOSIT_SIZE", "EVENTS", "VOLUME"]
+
+
+def daily_flows(transfers):
+    deposit = transforms.is_deposit(transfers)
+    size = pd.cut(
+        transfers["AMOUNT"], bins=transforms.DEPOSIT_SIZE_BINS, labels=transforms.DEPOSIT_SIZE_LABELS, right=False
+    ).astype(str).where(deposit, "")
+    return (
+        transfers.assign(DEPOSIT_SIZE=size)
+        .groupby(["DAY", "TOKEN", "DIRECTION", "DEPOSIT_SIZE"], as_index=False, observed=True)
+        .agg(EVENTS=("AMOUNT", "size"), VOLUME=("AMOUNT", "sum"))
+    )
+
+
+class MonthlyFlows(files.Directory):
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._partitions = {}
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, files.locked(self._path("lock"), exclusive):
+            yield
+
+    def _final(self):
+        # A final month whose partition file is gone (removed by hand, a lost disk) is rebuilt like an open one.
+        final = (files.read_json(self._path("meta.json")) or {"final": []})["final"]
+        return {month for month in final if os.path.exists(self._path(f"month={month}.parquet"))}
+
+    def update(self, transfers):
+        latest = transfers["BLOCK_TIMESTAMP"].max()
+        # meta.json is read, extended and rewritten under the lock, so concurrent refreshes never drop each other's
+        # final months.
+        with self._locked():
+            final = self._final()
+            months = transfers["DAY"].dt.to_period("M").astype(str)
+            pending = ~months.isin(final)
+            for month, rows in transfers[pending].groupby(months[pending], sort=True):
+                flows = daily_flows(rows)
+                files.write_parquet(self._path(f"month={month}.parquet"), flows)
+                self._partitions[month] = flows
+                if latest >= pd.Period(month, "M").end_time + FINAL_AFTER:
+                    final.add(month)
+
+            files.write_json(self._path("meta.json"), {"final": sorted(final), "updated": time.time()})
+
+    def read(self):
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=FLOW_COLUMNS)
+        with self._locked(exclusive=False):
+            names = sorted(n for n in os.listdir(self.root) if n.startswith("month=") and n.endswith(".parquet"))
+            frames = []
+            for name in names:
+                month = name[len("month="):-len(".parquet")]
+                if month not in self._partitions:
+                    self._partitions[month] = pd.read_parquet(self._path(name))
+                frames.append(self._partitions[month])
+        if not frames:
+            return pd.DataFrame(columns=FLOW_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
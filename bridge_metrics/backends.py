@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+
+from bridge_metrics import fetch, instrumentation, queries
+
+# Query backends behind the loaders. Every backend takes the same Snowflake-flavoured SQL and returns upper-cased,
+# Arrow-built DataFrames:
+#
+#   SnowflakeBackend   live warehouse through the shared connection pool
+#   DuckDBBackend      local engine over Parquet fixtures / snapshots laid out like the warehouse
+#
+# read_sql(query, tables={name: frame}) uploads local frames (the depositor cohort) as tables the query joins to,
+# instead of inlining them into the SQL text.
+#
+# Fixtures live at <root>/<database>/<schema>/<table>.parquet (or a <table>/ directory of part files), lower-cased,
+# e.g. fixtures/arbitrum_onchain_core_data/core/ez_token_transfers.parquet. Missing tables are created empty with the
+# warehouse schema so every query still plans.
+
+TABLES = {
+    "ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS": {
+        "block_number": "BIGINT",
+        "block_timestamp": "TIMESTAMP",
+        "tx_hash": "VARCHAR",
+        "event_index": "BIGINT",
+        "from_address": "VARCHAR",
+        "to_address": "VARCHAR",
+        "contract_address": "VARCHAR",
+        "symbol": "VARCHAR",
+        "amount": "DOUBLE",
+    },
+    "ARBITRUM_ONCHAIN_CORE_DATA.CORE.FACT_TRANSACTIONS": {
+        "block_number": "BIGINT",
+        "block_timestamp": "TIMESTAMP",
+        "tx_hash": "VARCHAR",
+        "from_address": "VARCHAR",
+        "to_address": "VARCHAR",
+    },
+    "ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS": {
+        "block_number": "BIGINT",
+        "block_timestamp": "TIMESTAMP",
+        "tx_hash": "VARCHAR",
+        "from_address": "VARCHAR",
+        "to_address": "VARCHAR",
+        "amount": "DOUBLE",
+    },
+    "ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS": {
+        "address": "VARCHAR",
+        "label_type": "VARCHAR",
+        "label_subtype": "VARCHAR",
+        "label": "VARCHAR",
+    },
+    "AXELAR.DEFI.EZ_BRIDGE_SQUID": {
+        "block_timestamp": "TIMESTAMP",
+        "tx_hash": "VARCHAR",
+        "sender": "VARCHAR",
+        "receiver": "VARCHAR",
+        "source_chain": "VARCHAR",
+        "destination_chain": "VARCHAR",
+        "token_symbol": "VARCHAR",
+        "amount": "DOUBLE",
+    },
+}
+
+
+# --- Snowflake ------------------------------------------------------------------------------------------------------
+class SnowflakeBackend:
+
+    dialect = "snowflake"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def read_sql(self, query, tables=None):
+        def run(conn):
+            # Temporary tables belong to the session, so they are uploaded on the connection that runs the query.
+            for name, frame in (tables or {}).items():
+                _write_temporary(conn, name, frame)
+            return fetch.fetch_frame(conn, query, stats=stats)
+
+        with instrumentation.timed_query(self.dialect, query) as stats:
+            return self.pool.run(run)
+
+    def query_history(self, query_ids):
+        # Queue / compile / execute breakdown for queries already run, from INFORMATION_SCHEMA.QUERY_HISTORY.
+        return self.read_sql(queries.query_history_query(query_ids))
+
+    def iter_frames(self, query):
+        with self.pool.connection() as conn:
+            yield from fetch.iter_frames(conn, query)
+
+
+def _write_temporary(conn, name, frame):
+    from snowflake.connector.pandas_tools import write_pandas
+
+    write_pandas(
+        conn, frame, name.upper(), auto_create_table=True, table_type="temporary", overwrite=True,
+        quote_identifiers=False, use_logical_type=True
+    )
+
+
+# --- DuckDB ---------------------------------------------------------------------------------------------------------
+_DATEADD_RE = re.compile(r"\bDATEADD\s*\(\s*(\w+)\s*,", re.IGNORECASE)
+_DATEDIFF_RE = re.compile(r"\bDATEDIFF\s*\(\s*(\w+)\s*,", re.IGNORECASE)
+
+# DATEADD takes an unquoted date part in Snowflake; the rewrite quotes it and dispatches through this macro.
+_DATEADD_MACRO = """
+CREATE OR REPLACE MACRO sf_dateadd(part, n, ts) AS ts + CASE lower(part)
+    WHEN 'second' THEN to_seconds(CAST(n AS BIGINT))
+    WHEN 'minute' THEN to_minutes(CAST(n AS BIGINT))
+    WHEN 'hour' THEN to_hours(CAST(n AS BIGINT))
+    WHEN 'day' THEN to_days(CAST(n AS INTEGER))
+    WHEN 'week' THEN to_weeks(CAST(n AS INTEGER))
+    WHEN 'month' THEN to_months(CAST(n AS INTEGER))
+    WHEN 'year' THEN to_years(CAST(n AS INTEGER))
+END
+"""
+
+
+def to_duckdb(query):
+    # Both engines count date-part boundaries in DATEDIFF/date_diff, so quoting the part is the whole shim.
+    # median(), date(), date_trunc() and '...'::date casts are accepted by DuckDB as written.
+    query = _DATEADD_RE.sub(lambda m: f"sf_dateadd('{m.group(1).lower()}',", query)
+    return _DATEDIFF_RE.sub(lambda m: f"date_diff('{m.group(1).lower()}',", query)
+
+
+def fixture_path(root, table):
+    return os.path.join(root, *table.lower().split("."))
+
+
+class DuckDBBackend:
+
+    dialect = "duckdb"
+
+    def __init__(self, fixtures_dir=None, database=":memory:"):
+        import duckdb
+
+        self.fixtures_dir = fixtures_dir
+        self._con = duckdb.connect(database)
+        self._tables_lock = threading.Lock()
+        self._con.execute("SET enable_progress_bar = false")
+        self._con.execute(_DATEADD_MACRO)
+        for table in TABLES:
+            self._create(table)
+
+    def _create(self, table):
+        database, schema, name = table.split(".")
+        attached = {
+            row[0].upper() for row in self._con.execute("SELECT database_name FROM duckdb_databases()").fetchall()
+        }
+        if database not in attached:
+            self._con.execute(f"ATTACH ':memory:' AS {database}")
+        self._con.execute(f"CREATE SCHEMA IF NOT EXISTS {database}.{schema}")
+
+        path = fixture_path(self.fixtures_dir, table) if self.fixtures_dir else None
+        if path and os.path.isdir(path):
+            source = f"read_parquet('{path}/*.parquet', union_by_name=true)"
+        elif path and os.path.exists(f"{path}.parquet"):
+            source = f"read_parquet('{path}.parquet')"
+        else:
+            columns = ", ".join(f"{column} {kind}" for column, kind in TABLES[table].items())
+            self._con.execute(f"CREATE OR REPLACE TABLE {table} ({columns})")
+            return
+        self._con.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {source}")
+
+    def register(self, table, frame):
+        # Load an in-memory frame as one of the warehouse tables (synthetic data, benchmarks, ad-hoc checks).
+        database, schema, name = table.split(".")
+        is_view = self._con.execute(
+            "SELECT count(*) FROM duckdb_views() WHERE upper(database_name) = ? AND upper(schema_name) = ? "
+            "AND upper(view_name) = ?",
+            [database, schema, name]
+        ).fetchone()[0]
+        if is_view:
+            self._con.execute(f"DROP VIEW {table}")
+        self._con.register("_incoming", frame)
+        self._con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM _incoming")
+        self._con.unregister("_incoming")
+
+    def read_sql(self, query, tables=None):
+        if not tables:
+            with instrumentation.timed_query(self.dialect, query) as stats:
+                return fetch.fetch_frame(self._con, to_duckdb(query), stats=stats)
+        # fetch runs every query on its own cursor, which cannot see views registered on another one, so the frames
+        # become real tables in the main database for the duration of the query (one such query at a time).
+        with self._tables_lock:
+            for name, frame in tables.items():
+                self._con.register("_incoming", frame)
+                self._con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _incoming")
+                self._con.unregister("_incoming")
+            try:
+                with instrumentation.timed_query(self.dialect, query) as stats:
+                    return fetch.fetch_frame(self._con, to_duckdb(query), stats=stats)
+            finally:
+                for name in tables:
+                    self._con.execute(f"DROP TABLE IF EXISTS {name}")
+
+    def iter_frames(self, query):
+        yield from fetch.iter_frames(self._con, to_duckdb(query))
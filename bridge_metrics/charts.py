@@ -0,0 +1,273 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+from bridge_metrics import downsample
+
+# Figure builders for every dashboard chart. Kept free of Streamlit so the same figures can be built by the
+# benchmarks and any offline tooling.
+
+HORIZONTAL_LEGEND = dict(
+    orientation="h",
+    yanchor="bottom",
+    y=1.02,
+    xanchor="center",
+    x=0.5
+)
+
+ACTION_TYPE_COLORS = {
+    "Deposit": "#84fcd7",
+    "Withdraw": "#3c876e"
+}
+
+DEPOSIT_SIZE_COLORS = {
+    'a/ below $100': '#97fce4',
+    'b/ $100 - $1K': '#4ee4c1',
+    'c/ $1K - $10K': '#1bba94',
+    'd/ $10K - $100K': '#069a77',
+    'e/ S100K+': '#017459'
+}
+
+ARBITRUM_USE_GROUP_COLORS = {
+    'Arbitrum User Wallet': '#97fce4',
+    'Deposit Wallet': '#068f6e'
+}
+
+PRE_DEPOSIT_ACTIVITY_COLORS = {
+    'a/ Pre-Deposit Bridge': '#97fce4',
+    'b/ Pre-Deposit Cex Transfer': '#068f6e',
+    'c/ Other wallet': '#00eeb5'
+}
+
+
+# --- Row 1 ----------------------------------------------------------------------------------------------------------
+def tvl_by_token(df):
+    fig = px.bar(
+        df,
+        x="DAY",
+        y="TVL",
+        color="TOKEN",
+        title="Daily Hyperliquid TVL by Token"
+    )
+    fig.update_layout(
+        barmode="stack",
+        xaxis_title="",
+        yaxis_title="USD",
+        legend=HORIZONTAL_LEGEND,
+        legend_title_text=""
+    )
+    return fig
+
+
+def net_deposits(df):
+    fig = px.bar(
+        df,
+        x="DAY",
+        y="NET_DEPOSIT",
+        title="Daily Hyperliquid Net Deposits",
+        color_discrete_sequence=["#e2fb43"]
+    )
+    fig.update_layout(xaxis_title="", yaxis_title="USD", bargap=0.2)
+    return fig
+
+
+def stablecoin_share(df):
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scattergl(
+            x=df["DAY"],
+            y=df["PERCENT_OF_SABLECOINS_IN_HYPERLIQUID"],
+            name="PERCENT_OF_SABLECOINS_IN_HYPERLIQUID",
+            mode="lines",
+            yaxis="y1"
+        )
+    )
+    fig.update_layout(
+        title="Daily Percent of Arbitrum Stablecoins in Hyperliquid",
+        yaxis=dict(title="%"),
+        xaxis=dict(title=" "),
+        legend=dict(HORIZONTAL_LEGEND, y=1.05)
+    )
+    return fig
+
+
+# --- Row 2 ----------------------------------------------------------------------------------------------------------
+def weekly_by_action_type(df, y, title, yaxis_title):
+    fig = px.bar(
+        df,
+        x="WEEK",
+        y=y,
+        color="ACTION_TYPE",
+        color_discrete_map=ACTION_TYPE_COLORS,
+        title=title
+    )
+    fig.update_layout(
+        barmode="stack",
+        xaxis_title="",
+        yaxis_title=yaxis_title,
+        legend=HORIZONTAL_LEGEND,
+        legend_title_text=""
+    )
+    return fig
+
+
+def weekly_volume(df):
+    return weekly_by_action_type(df, "VOLUME", "Weekly Bridge Volume by Action Type", "USD")
+
+
+def weekly_users(df):
+    return weekly_by_action_type(df, "USERS", "Weekly Bridge Users by Action Type", "Wallet count")
+
+
+def weekly_events(df):
+    return weekly_by_action_type(df, "EVENTS", "Weekly Bridge Events by Action Type", "Txns count")
+
+
+# --- Row 4 ----------------------------------------------------------------------------------------------------------
+def deposit_size_bar(df):
+    fig = px.bar(
+        df,
+        x="DEPOSIT_SIZE",
+        y="DEPOSITS",
+        title="Breakdown of Deposits by Size",
+        color_discrete_sequence=["#97fce4"]
+    )
+    fig.update_layout(
+        xaxis_title="Deposit Size",
+        yaxis_title="Txns count",
+        bargap=0.2
+    )
+    return fig
+
+
+def donut(df, names, values, title, color_map):
+    fig = px.pie(
+        df,
+        names=names,
+        values=values,
+        title=title,
+        hole=0.5,
+        color=names,
+        color_discrete_map=color_map
+    )
+    fig.update_traces(textposition='outside', textinfo='percent+label', pull=[0.05]*len(df))
+    fig.update_layout(showlegend=True, legend=dict(orientation="v", y=0.5, x=1.1))
+    return fig
+
+
+def deposit_size_donut(df):
+    return donut(df, "DEPOSIT_SIZE", "DEPOSITS", "Share of Deposits by Size", DEPOSIT_SIZE_COLORS)
+
+
+# --- Row 6 ----------------------------------------------------------------------------------------------------------
+def new_and_total_depositors(df):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df["DAY"],
+        y=df["NEW_DEPOSITORS"],
+        name="New Depositors",
+        yaxis="y1",
+        marker_color="#8ef1d9"
+    ))
+    fig.add_trace(go.Scattergl(
+        x=df["DAY"],
+        y=df["TOTAL_DEPOSITORS"],
+        name="Total Depositors",
+        mode="lines",
+        yaxis="y2",
+        line=dict(color="#0c8669")
+    ))
+    fig.update_layout(
+        title="Daily New and Total Hyperliquid Depositors",
+        yaxis=dict(title="Wallet count"),
+        yaxis2=dict(title="Wallet count", overlaying="y", side="right"),
+        xaxis=dict(title=" "),
+        barmode="group",
+        legend=dict(HORIZONTAL_LEGEND, y=1.05)
+    )
+    return fig
+
+
+# --- Rows 7 & 8 -----------------------------------------------------------------------------------------------------
+def wallet_type_bar(df, y, title):
+    fig = px.bar(
+        df,
+        x="WALLET_TYPE",
+        y=y,
+        title=title,
+        color_discrete_sequence=["#97fce4"]
+    )
+    fig.update_layout(
+        xaxis_title="Wallet Type",
+        yaxis_title="$USD",
+        bargap=0.2
+    )
+    return fig
+
+
+def wallet_type_avg(df):
+    return wallet_type_bar(df, "AVG_USER_DEPOSIT_VOLUME", "Avg Deposit by Wallet Type")
+
+
+def wallet_type_median(df):
+    return wallet_type_bar(df, "MEDIAN_USER_DEPOSIT_VOLUME", "Median Deposit by Wallet Type")
+
+
+def arbitrum_use_group_donut(df):
+    return donut(df, "WALLET_TYPE", "WALLETS", "Depositors by Arbitrum Use Group", ARBITRUM_USE_GROUP_COLORS)
+
+
+def pre_deposit_activity_donut(df):
+    return donut(df, "WALLET_TYPE", "WALLETS", "Depositors by Arbitrum Use Group", PRE_DEPOSIT_ACTIVITY_COLORS)
+
+
+# --- Row 9 ----------------------------------------------------------------------------------------------------------
+RETENTION_COLORSCALE = [[0, "#0b1f1a"], [0.5, "#1bba94"], [1, "#97fce4"]]
+
+
+def retention_heatmap(df, freq):
+    # Cohorts down, periods since the first deposit across. Age 0 is always 100%, so the colour range is set by the
+    # later periods.
+    rows = df[df["PERIOD"] == freq]
+    name = "Week" if freq == "W" else "Month"
+    retained = rows.pivot(index="COHORT", columns="AGE", values="RETENTION")
+    wallets = rows.pivot(index="COHORT", columns="AGE", values="WALLETS")
+    later = rows.loc[rows["AGE"] > 0, "RETENTION"]
+    fig = go.Figure(go.Heatmap(
+        # Sent as typed arrays; 4-byte cells halve the payload of the weekly matrix.
+        z=retained.to_numpy(dtype="float32"),
+        x=retained.columns,
+        y=retained.index,
+        customdata=wallets.fillna(0).to_numpy(dtype="int32"),
+        hoverongaps=False,
+        zmin=0,
+        zmax=later.max() if len(later) else 100,
+        colorscale=RETENTION_COLORSCALE,
+        colorbar=dict(title="% retained"),
+        hovertemplate=f"Cohort %{{y|%Y-%m-%d}}<br>{name} %{{x}}<br>%{{z:.1f}}% retained (%{{customdata}} wallets)"
+                      "<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"{'Weekly' if freq == 'W' else 'Monthly'} Depositor Retention by First-Deposit Cohort",
+        xaxis=dict(title=f"{name}s since first deposit"),
+        yaxis=dict(title="Cohort", autorange="reversed"),
+        height=600
+    )
+    return fig
+
+
+def weekly_retention(df):
+    return retention_heatmap(df, "W")
+
+
+def monthly_retention(df):
+    return retention_heatmap(df, "M")
+
+
+# --- Resampling -----------------------------------------------------------------------------------------------------
+# Applied to the long daily series before the builder runs (see downsample). Line traces are WebGL (Scattergl).
+RESAMPLE = {
+    tvl_by_token: downsample.Bars({"TVL": "last"}, by=["TOKEN"]),
+    net_deposits: downsample.Bars({"NET_DEPOSIT": "sum"}, by=["TOKEN"]),
+    stablecoin_share: downsample.Line("PERCENT_OF_SABLECOINS_IN_HYPERLIQUID"),
+    new_and_total_depositors: downsample.Bars({"NEW_DEPOSITORS": "sum", "TOTAL_DEPOSITORS": "last"}),
+}
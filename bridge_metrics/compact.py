@@ -0,0 +1,179 @@
+import hashlib
+import time
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bridge_metrics import instrumentation
+
+# Compact in-memory form of the panel datasets. One copy per process is handed to every session as-is (singleflight
+# loaders, st.cache_resource snapshots) instead of a pickled copy per session; pandas copy-on-write keeps that safe,
+# since a session that modifies a frame only copies the columns it touches. Copy-on-write is the default from pandas 3
+# only, and the Snowflake connector's pandas extra still requires pandas<3, so it is switched on below for pandas 2.x
+# (requirements.txt asks for 2.2 or later, where the mode is complete).
+#
+#   - label columns (TOKEN, ACTION_TYPE, ...) become categoricals: one int8 code per row plus the few labels;
+#   - integers are downcast to the narrowest type holding their range; floats to float32 only where that is lossless
+#     (amounts and running totals need float64);
+#   - fixed-width bytes columns (the sketch registers) become Arrow fixed_size_binary: one contiguous buffer that
+#     readers view with numpy instead of a Python bytes object per row.
+#
+# Panel frames carry no wallet addresses; per-wallet data lives in the depositor index as fixed 20-byte records. The
+# bridge extract itself keeps its addresses and transaction hashes as fixed_size_binary too (hex_column, 20 and 32
+# bytes instead of a 42 / 66 character string each; see transforms.compact_transfers).
+# Every compaction records the dataset's footprint (instrumentation panel, Prometheus gauge, snapshot manifest).
+# Published snapshots are Arrow IPC files of the compacted frames, memory-mapped back by every process (read_ipc).
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+CATEGORIES = {"TOKEN", "ACTION_TYPE", "DIRECTION", "WALLET_TYPE", "DEPOSIT_SIZE", "PERIOD"}
+
+
+def footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def fingerprint(df):
+    # Content hash of a frame (dtypes and values): keys built figures and cached results of queries over local frames.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# --- Fixed-Width Bytes ----------------------------------------------------------------------------------------------
+def hex_bytes(values, width):
+    # '0x' + 2 * width hex chars (either case) -> S<width> array; anything else is zeroed and flagged invalid.
+    values = pd.Series(values, dtype="object").str.lower()
+    valid = values.str.fullmatch(f"0x[0-9a-f]{{{2 * width}}}", na=False).to_numpy()
+    out = np.zeros(len(values), dtype=f"S{width}")
+    if valid.any():
+        out[valid] = np.frombuffer(bytes.fromhex("".join(v[2:] for v in values[valid])), dtype=f"S{width}")
+    return out, valid
+
+
+def hex_strings(packed):
+    # Back to '0x' + lowercase hex (S<n> items drop trailing zero bytes, the raw buffer does not).
+    width = 2 * packed.dtype.itemsize
+    raw = np.ascontiguousarray(packed).tobytes().hex()
+    return ["0x" + raw[i:i + width] for i in range(0, len(raw), width)]
+
+
+def binary_column(packed, index=None, name=None):
+    # S<n> array -> Arrow fixed_size_binary(n) column over the same bytes.
+    packed = np.ascontiguousarray(packed)
+    array = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(packed.dtype.itemsize), len(packed), [None, pa.py_buffer(packed)]
+    )
+    return pd.Series(pd.arrays.ArrowExtensionArray(array), index=index, name=name)
+
+
+def hex_column(values, width):
+    # Hex strings as a fixed_size_binary(width) column; a column that already is one is returned as-is.
+    if _is_binary(values):
+        return values
+    return binary_column(hex_bytes(values.to_numpy(), width)[0], values.index, values.name)
+
+
+def fixed_bytes(values):
+    # S<n> view of a fixed_size_binary column, without a copy for single-chunk columns.
+    chunks = values.array.__arrow_array__().combine_chunks()
+    width = chunks.type.byte_width
+    if not len(chunks):
+        return np.zeros(0, dtype=f"S{width}")
+    return np.frombuffer(chunks.buffers()[1], dtype=f"S{width}", count=len(chunks), offset=chunks.offset * width)
+
+
+def _is_binary(values):
+    return isinstance(values.dtype, pd.ArrowDtype) and pa.types.is_fixed_size_binary(values.dtype.pyarrow_dtype)
+
+
+# --- Columns --------------------------------------------------------------------------------------------------------
+def column(values, name):
+    if name in CATEGORIES:
+        return values.astype("category")
+    if isinstance(values.dtype, (pd.CategoricalDtype, pd.ArrowDtype)):
+        return values
+    kind = values.dtype.kind
+    if kind == "i":
+        return pd.to_numeric(values, downcast="integer")
+    if kind == "u":
+        return pd.to_numeric(values, downcast="unsigned")
+    if kind == "f":
+        narrow = values.astype("float32")
+        lossless = np.array_equal(narrow.to_numpy("float64"), values.to_numpy("float64"), equal_nan=True)
+        return narrow if lossless else values
+    if kind == "O" and len(values) and isinstance(values.iloc[0], bytes):
+        widths = values.map(len)
+        if widths.nunique() == 1:
+            binary = pa.array(values.tolist(), pa.binary(int(widths.iloc[0])))
+            return pd.Series(pd.arrays.ArrowExtensionArray(binary), index=values.index, name=values.name)
+    return values
+
+
+def frame(df, name=None):
+    start = time.perf_counter()
+    out = pd.DataFrame({c: column(df[c], c) for c in df.columns}, index=df.index)
+    if name is not None:
+        _record(name, out, start, raw_bytes=footprint(df))
+    return out
+
+
+def record(name, df, **fields):
+    # Footprint of a frame compacted as it was built rather than in one pass (the bridge extract, batch by batch).
+    _record(name, df, time.perf_counter(), **fields)
+
+
+def _record(name, df, start, **fields):
+    nbytes = footprint(df)
+    instrumentation.RECORDER.record(
+        "dataset", name, seconds=time.perf_counter() - start, rows=len(df), bytes=nbytes, **fields
+    )
+    instrumentation.RECORDER.gauge("dataset_bytes", nbytes, "In-memory size of the latest dataset frame.", name=name)
+
+
+def compacted(fn):
+    # Dataset builders return their frame compacted, recorded under the builder's (= dataset's) name.
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        return frame(fn(*args, **kwargs), fn.__name__)
+    return wrapper
+
+
+def _arrow_types(arrow_type):
+    return pd.ArrowDtype(arrow_type) if pa.types.is_fixed_size_binary(arrow_type) else None
+
+
+# --- Files ----------------------------------------------------------------------------------------------------------
+def write_ipc(df, path):
+    # Uncompressed Arrow IPC (Feather v2), so readers can use the file's buffers in place.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_ipc(path, name=None):
+    # Memory-mapped: every column is a read-only view of the file (split_blocks keeps pandas from consolidating columns
+    # into new blocks), so all processes on a host share the one copy in the OS page cache. The mapping lives as long
+    # as the frame does, even once the file is unlinked.
+    start = time.perf_counter()
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    out = table.to_pandas(split_blocks=True, ignore_metadata=True, types_mapper=_arrow_types)
+    if name is not None:
+        _record(name, out, start, mapped=True)
+    return out
+
+
+def read_table(path):
+    # pandas cannot rebuild fixed_size_binary columns from its own parquet metadata, so the table is converted
+    # without it (binary columns stay Arrow buffers).
+    return pq.read_table(path).to_pandas(ignore_metadata=True, types_mapper=_arrow_types)
+
+
+def read_parquet(path, name=None):
+    # Compacted again after reading, which also restores the categoricals.
+    return frame(read_table(path), name)
@@ -0,0 +1,172 @@
+import pandas as pd
+
+from bridge_metrics import (
+    aggregates, charts, compact, depositors, labels, quantiles, queries, retention, sketches, supply, transforms
+)
+
+# Dataset definitions behind every dashboard panel, independent of Streamlit. Each takes a `read_sql(query)` callable
+# (any backend) and, where it derives from it, the prepared bridge-transfer extract. Panel frames come back compacted
+# (see compact) and are shared read-only between sessions.
+
+WALLET_TYPE_COLUMNS = ["WALLET_TYPE", "WALLETS", "AVG_USER_DEPOSIT_VOLUME", "MEDIAN_USER_DEPOSIT_VOLUME"]
+
+
+# --- Warehouse Extracts ---------------------------------------------------------------------------------------------
+def bridge_transfers(read_sql):
+    fetched = read_sql(queries.BRIDGE_TRANSFERS_QUERY)
+    transfers = transforms.prepare_transfers(fetched)
+    compact.record("bridge_transfers", transfers, raw_bytes=compact.footprint(fetched))
+    return transfers
+
+
+def stablecoin_supply(read_sql, ledger=None):
+    # Incremental with a persisted ledger; without one, a full-history scan folded the same way.
+    if ledger is None:
+        return supply.supply_over_time(supply.ledger_rows(read_sql(queries.stablecoin_supply_deltas_query())))
+    ledger.refresh(read_sql)
+    return ledger.supply()
+
+
+# --- Panels ---------------------------------------------------------------------------------------------------------
+@compact.compacted
+def hyperliquid_data_over_time(read_sql, transfers, daily=None, ledger=None):
+    daily = transforms.daily_net_deposits(transfers) if daily is None else daily
+    return transforms.data_over_time(daily, stablecoin_supply(read_sql, ledger=ledger))
+
+
+@compact.compacted
+def hyperliquid_bridge_data(read_sql, transfers):
+    return transforms.weekly_bridge_activity(transfers)
+
+
+@compact.compacted
+def weekly_bridge_data_by_token(read_sql, transfers):
+    # Row 2 under a token filter; distinct users do not add up across tokens, so they are counted per token.
+    return transforms.weekly_bridge_activity(transfers, by=["TOKEN"])
+
+
+@compact.compacted
+def daily_flows(read_sql, transfers, monthly=None):
+    # Additive DAY x TOKEN x DIRECTION x DEPOSIT_SIZE aggregates behind the date-range / token filters.
+    if monthly is None:
+        return aggregates.daily_flows(transfers)
+    monthly.update(transfers)
+    return monthly.read()
+
+
+@compact.compacted
+def daily_sketches(read_sql, transfers, store=None):
+    # Per-day distinct-count sketches behind Row 2 (settings.DISTINCT_COUNTS = "sketch").
+    if store is None:
+        return sketches.sketch(transfers)
+    store.update(transfers)
+    return store.read()
+
+
+@compact.compacted
+def daily_quantiles(read_sql, transfers, store=None):
+    # Per-day deposit / withdrawal amount sketches behind the Row 3 median and percentiles (settings.QUANTILES).
+    if store is None:
+        return quantiles.sketch(transfers)
+    store.update(transfers)
+    return store.read()
+
+
+@compact.compacted
+def hyperliquid_stats(read_sql, transfers):
+    return transforms.deposit_stats(transfers)
+
+
+@compact.compacted
+def deposit_distribution(read_sql, transfers):
+    return transforms.deposit_distribution(transfers)
+
+
+def depositor_index(transfers, index=None):
+    # Without a persisted index (benchmarks, ad-hoc runs) the extract is folded into a throwaway one.
+    index = depositors.DepositorIndex() if index is None else index
+    index.update(transfers)
+    return index
+
+
+@compact.compacted
+def total_hyperliquid_stats(read_sql, transfers, index=None):
+    return depositor_index(transfers, index).total_depositors()
+
+
+@compact.compacted
+def new_depositors_over_time(read_sql, transfers, index=None):
+    return depositor_index(transfers, index).new_depositors_over_time()
+
+
+@compact.compacted
+def depositor_retention(read_sql, transfers):
+    # Weekly and monthly cohorts in one frame (PERIOD "W" / "M"); the page picks one.
+    return retention.cohort_retention(transfers)
+
+
+@compact.compacted
+def depositors_by_arbitrum_use_group(read_sql, transfers, index=None):
+    cohort = depositor_index(transfers, index).cohort()
+    if cohort.empty:
+        return pd.DataFrame(columns=WALLET_TYPE_COLUMNS)
+    return read_sql(queries.ARBITRUM_USE_GROUP_QUERY, tables={queries.COHORT_TABLE: queries.cohort_table(cohort)})
+
+
+@compact.compacted
+def depositors_by_pre_deposit_activity(read_sql, transfers, label_index=None, index=None):
+    # Without a persisted index (benchmarks, ad-hoc runs) the labels are fetched into a throwaway one.
+    cohort = depositor_index(transfers, index).cohort()
+    if cohort.empty:
+        return pd.DataFrame(columns=WALLET_TYPE_COLUMNS)
+    if label_index is None:
+        label_index = labels.LabelIndex().refresh(read_sql)
+    senders = read_sql(
+        queries.pre_deposit_senders_query(cohort), tables={queries.COHORT_TABLE: queries.cohort_table(cohort)}
+    )
+    return transforms.wallet_type_summary(transforms.pre_deposit_wallet_types(cohort, senders, label_index))
+
+
+# Panel dataset -> the figures built from it, in page order.
+PANELS = {
+    "hyperliquid_data_over_time": (
+        hyperliquid_data_over_time, [charts.tvl_by_token, charts.net_deposits, charts.stablecoin_share]
+    ),
+    "hyperliquid_bridge_data": (
+        hyperliquid_bridge_data, [charts.weekly_volume, charts.weekly_users, charts.weekly_events]
+    ),
+    "weekly_bridge_data_by_token": (weekly_bridge_data_by_token, []),
+    "daily_flows": (daily_flows, []),
+    "daily_sketches": (daily_sketches, []),
+    "daily_quantiles": (daily_quantiles, []),
+    "hyperliquid_stats": (hyperliquid_stats, []),
+    "deposit_distribution": (deposit_distribution, [charts.deposit_size_bar, charts.deposit_size_donut]),
+    "total_hyperliquid_stats": (total_hyperliquid_stats, []),
+    "new_depositors_over_time": (new_depositors_over_time, [charts.new_and_total_depositors]),
+    "depositor_retention": (depositor_retention, [charts.weekly_retention, charts.monthly_retention]),
+    "depositors_by_arbitrum_use_group": (
+        depositors_by_arbitrum_use_group,
+        [charts.wallet_type_avg, charts.wallet_type_median, charts.arbitrum_use_group_donut]
+    ),
+    "depositors_by_pre_deposit_activity": (
+        depositors_by_pre_deposit_activity,
+        [charts.wallet_type_avg, charts.wallet_type_median, charts.pre_deposit_activity_donut]
+    ),
+}
+
+
+def build_all(read_sql, transfers, daily=None, label_index=None, monthly=None, ledger=None, sketch_store=None,
+              quantile_store=None, depositor_index=None):
+    # Every panel dataset at once, as published by the refresh worker. The depositor panels share one index.
+    index = depositors.DepositorIndex() if depositor_index is None else depositor_index
+    extras = {
+        "hyperliquid_data_over_time": {"daily": daily, "ledger": ledger},
+        "daily_flows": {"monthly": monthly},
+        "daily_sketches": {"store": sketch_store},
+        "daily_quantiles": {"store": quantile_store},
+        "total_hyperliquid_stats": {"index": index},
+        "new_depositors_over_time": {"index": index},
+        "depositors_by_arbitrum_use_group": {"index": index},
+        "depositors_by_pre_deposit_activity": {"label_index": label_index, "index": index},
+    }
+    return {name: loader(read_sql, transfers, **extras.get(name, {})) for name, (loader, _) in PANELS.items()}
@@ -0,0 +1,134 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import compact, files, transforms
+
+# Local per-wallet index of first deposits, so the depositor rows (total depositors, new depositors per day, the
+# 30-day cohort behind Rows 7 & 8) are read off arrays instead of re-grouping every deposit by wallet for each panel.
+#
+#   <root>/wallets-<rows>.npy   one record per depositing wallet, sorted by address, memory-mapped on load:
+#                               ADDRESS (20 raw bytes, "S20"; a wallet's position is its code), FIRST_DAY (days since
+#                               1970-01-01, int32), VOLUME (all-time deposit volume, float64) -- 32 bytes a wallet
+#   <root>/meta.json            {"rows": <extract rows folded in>, "wallets": n}
+#
+# The transfer store only ever appends, so each update folds in just the deposits past "rows": wallets already in the
+# index get their volume added (and an earlier first day, should one arrive), new ones are inserted in order. Each
+# update writes a new wallets file and then swaps meta.json, so a reader never pairs a watermark with the wrong file.
+
+WALLET = np.dtype([("ADDRESS", "S20"), ("FIRST_DAY", "<i4"), ("VOLUME", "<f8")])
+
+
+def _days(day):
+    return pd.to_datetime(day).to_numpy().astype("datetime64[D]").astype("int32")
+
+
+def _dates(days):
+    return pd.to_datetime(days.astype("datetime64[D]").astype("datetime64[ns]"))
+
+
+def first_deposits(transfers):
+    # Wallet records of a batch of transfers, sorted by address. The extract already holds addresses as 20 raw bytes.
+    rows = transforms.deposits(transfers)
+    packed = compact.fixed_bytes(rows["USER_ADDRESS"])
+    addresses, code = np.unique(packed, return_inverse=True)
+    out = np.zeros(len(addresses), dtype=WALLET)
+    out["ADDRESS"] = addresses
+    out["FIRST_DAY"] = np.iinfo("int32").max
+    np.minimum.at(out["FIRST_DAY"], code, _days(rows["DAY"]))
+    out["VOLUME"] = np.bincount(code, weights=rows["AMOUNT"].to_numpy(dtype="float64"), minlength=len(addresses))
+    return out
+
+
+def fold(wallets, batch):
+    # Both sorted by address; returns a new sorted array.
+    pos = np.searchsorted(wallets["ADDRESS"], batch["ADDRESS"])
+    found = pos < len(wallets)
+    found[found] = wallets["ADDRESS"][pos[found]] == batch["ADDRESS"][found]
+    out = np.array(wallets)
+    known = pos[found]
+    out["FIRST_DAY"][known] = np.minimum(out["FIRST_DAY"][known], batch["FIRST_DAY"][found])
+    out["VOLUME"][known] += batch["VOLUME"][found]
+    return np.insert(out, pos[~found], batch[~found])
+
+
+class DepositorIndex(files.Directory):
+
+    def __init__(self, root=None):
+        self.root = root
+        self._lock = threading.Lock()
+        self._wallets = None
+        self._meta = None
+
+    # --- State ----------------------------------------------------------------------------------------------------
+    def _load(self):
+        if self._wallets is not None or self.root is None:
+            return
+        meta = files.read_json(self._path("meta.json"))
+        if meta is None:
+            return
+        try:
+            wallets = np.load(self._path(f"wallets-{meta['rows']}.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            return
+        self._wallets, self._meta = wallets, meta
+
+    def wallets(self):
+        self._load()
+        return np.zeros(0, dtype=WALLET) if self._wallets is None else self._wallets
+
+    def rows(self):
+        self._load()
+        return self._meta["rows"] if self._meta else 0
+
+    def nbytes(self):
+        return self.wallets().nbytes
+
+    # --- Refresh --------------------------------------------------------------------------------------------------
+    def update(self, transfers):
+        with self._lock:
+            rows = self.rows()
+            if rows == len(transfers):
+                return 0
+            if rows < len(transfers):
+                wallets, added = fold(self.wallets(), first_deposits(transfers.iloc[rows:])), len(transfers) - rows
+            else:
+                wallets, added = first_deposits(transfers), len(transfers)
+            meta = {"rows": len(transfers), "wallets": len(wallets)}
+
+            if self.root is not None:
+                os.makedirs(self.root, exist_ok=True)
+                files.write_npy(self._path(f"wallets-{meta['rows']}.npy"), wallets)
+                files.write_json(self._path("meta.json"), meta)
+                if self._meta and self._meta["rows"] != meta["rows"]:
+                    files.remove_quietly(self._path(f"wallets-{self._meta['rows']}.npy"))
+
+            self._wallets, self._meta = wallets, meta
+            return added
+
+    # --- Panels ---------------------------------------------------------------------------------------------------
+    def total_depositors(self):
+        return pd.DataFrame({"TOTAL_DEPOSITORS": [len(self.wallets())]})
+
+    def new_depositors_over_time(self):
+        # Days with new depositors, latest first, with the running total.
+        days, counts = np.unique(self.wallets()["FIRST_DAY"], return_counts=True)
+        df = pd.DataFrame({
+            "DAY": _dates(days),
+            "NEW_DEPOSITORS": counts.astype("int64"),
+            "TOTAL_DEPOSITORS": counts.cumsum().astype("int64"),
+        })
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def cohort(self, days=30, today=None):
+        # Wallets whose first deposit is in the last `days` days, with their all-time deposit volume.
+        today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+        wallets = self.wallets()
+        recent = wallets[wallets["FIRST_DAY"] >= _days([today - pd.Timedelta(days=days)])[0]]
+        return pd.DataFrame({
+            "USER1": compact.hex_strings(recent["ADDRESS"]),
+            "FIRST_DEPOSIT_DAY": _dates(recent["FIRST_DAY"]),
+            "DEPOSIT_VOLUME": recent["VOLUME"].astype("float64"),
+        })
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import transforms
+
+# Resampling of the long daily series right before their figures are built, so the Plotly JSON sent to the browser
+# stays bounded however much history (or however wide a date range) is on screen.
+#
+#   Line  Largest-Triangle-Three-Buckets down to `max_points`; keeps the peaks and troughs a plain stride would drop.
+#   Bars  re-binned to days, weeks (Monday, as in the weekly panels) or months, whichever is the finest that fits
+#         `max_bars`. Flows are summed per bin, levels (TVL, running totals) take the last day of the bin.
+#
+# Series already under the limit are passed through untouched.
+
+FREQUENCIES = {"D": "Daily", "W": "Weekly", "M": "Monthly"}
+
+
+def lttb(x, y, threshold):
+    # Indices of the points to keep, first and last always included. x must be sorted.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    keep = np.empty(threshold, dtype="int64")
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+class Line:
+
+    def __init__(self, y, x="DAY"):
+        self.x = x
+        self.y = y
+
+    def apply(self, df, max_points, max_bars):
+        if len(df) <= max_points:
+            return df, "D"
+        df = df.sort_values(self.x, kind="stable")
+        # NaN points (days without a supply row) would poison the bucket averages; they only ever render as gaps.
+        df = df[np.isfinite(df[self.y].to_numpy(dtype="float64"))]
+        x = pd.to_datetime(df[self.x]).to_numpy().astype("datetime64[ns]").view("int64")
+        return df.iloc[lttb(x, df[self.y].to_numpy(), max_points)].reset_index(drop=True), "D"
+
+
+class Bars:
+
+    def __init__(self, how, by=(), x="DAY"):
+        self.x = x
+        self.how = how
+        self.by = list(by)
+
+    def apply(self, df, max_points, max_bars):
+        if df.empty:
+            return df, "D"
+        day = pd.to_datetime(df[self.x])
+        for freq in FREQUENCIES:
+            start = transforms.period_start(day, freq)
+            if start.nunique() <= max_bars:
+                break
+        if freq == "D":
+            return df, freq
+        order = np.argsort(day.to_numpy(), kind="stable")
+        binned = df.iloc[order].assign(**{self.x: start.to_numpy()[order]})
+        return binned.groupby([self.x, *self.by], as_index=False, sort=True).agg(self.how), freq
+
+
+def retitle(fig, freq):
+    # Bar charts titled "Daily ..." say what a bar covers once re-binned.
+    title = fig.layout.title.text
+    if freq != "D" and title:
+        fig.update_layout(title_text=title.replace("Daily", FREQUENCIES[freq], 1))
+    return fig
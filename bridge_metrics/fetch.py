@@ -0,0 +1,85 @@
+import pyarrow as pa
+
+# Result fetching without per-row Python objects. Snowflake (fetch_arrow_batches) and DuckDB (to_arrow_reader) cursors
+# hand back Arrow record batches directly; anything else (e.g. the sqlite stand-in) falls back to a DBAPI fetchmany loop.
+# Column names are upper-cased so every engine looks like Snowflake to the transforms.
+
+BATCH_ROWS = 100_000
+
+
+def _upper(table):
+    return table.rename_columns([name.upper() for name in table.column_names])
+
+
+def _upper_batch(batch):
+    return pa.RecordBatch.from_arrays(batch.columns, names=[name.upper() for name in batch.schema.names])
+
+
+def _to_pandas(table):
+    # split_blocks/self_destruct let Arrow release each column as soon as pandas owns it, so a large result is
+    # never held twice in full.
+    return table.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+
+
+def _execute(cursor, query, params):
+    if params:
+        cursor.execute(query, params)
+    else:
+        cursor.execute(query)
+
+
+def _dbapi_batches(cursor, batch_rows):
+    names = [d[0].upper() for d in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays([pa.array(c) for c in columns], names=names)
+
+
+def iter_arrow_batches(conn, query, params=None, batch_rows=BATCH_ROWS):
+    cursor = conn.cursor()
+    try:
+        _execute(cursor, query, params)
+        if hasattr(cursor, "fetch_arrow_batches"):
+            for table in cursor.fetch_arrow_batches():
+                yield from _upper(table).to_batches()
+        elif hasattr(cursor, "to_arrow_reader"):
+            for batch in cursor.to_arrow_reader(batch_rows):
+                yield _upper_batch(batch)
+        else:
+            yield from _dbapi_batches(cursor, batch_rows)
+    finally:
+        cursor.close()
+
+
+def fetch_arrow(conn, query, params=None, stats=None):
+    # `stats`, when given, is filled with the warehouse query id and the size of the result for instrumentation.
+    cursor = conn.cursor()
+    try:
+        _execute(cursor, query, params)
+        if hasattr(cursor, "fetch_arrow_all"):
+            table = cursor.fetch_arrow_all(force_return_table=True)
+        elif hasattr(cursor, "to_arrow_table"):
+            table = cursor.to_arrow_table()
+        else:
+            names = [d[0].upper() for d in cursor.description]
+            batches = list(_dbapi_batches(cursor, BATCH_ROWS))
+            table = pa.Table.from_batches(batches) if batches else pa.table({n: pa.array([]) for n in names})
+        if stats is not None:
+            stats.update(query_id=getattr(cursor, "sfqid", None), rows=table.num_rows, bytes=table.nbytes)
+    finally:
+        cursor.close()
+    return _upper(table)
+
+
+def fetch_frame(conn, query, params=None, stats=None):
+    return _to_pandas(fetch_arrow(conn, query, params, stats))
+
+
+def iter_frames(conn, query, params=None, batch_rows=BATCH_ROWS):
+    # For results too large to hold as one Arrow table plus one DataFrame: each batch is converted and handed to
+    # the caller, then dropped.
+    for batch in iter_arrow_batches(conn, query, params, batch_rows):
+        yield _to_pandas(pa.Table.from_batches([batch]))
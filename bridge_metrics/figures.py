@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+from bridge_metrics import charts, compact, downsample, singleflight
+
+# Built Plotly figures, cached per process and keyed by the chart builder, the resampling limits and a content
+# fingerprint of the input frame. A rerun (or another session) over unchanged data reuses the figure and its
+# serialized size instead of re-running Plotly Express; any change to the data changes the fingerprint.
+#
+# Entries are shared between sessions as-is; Streamlit only reads the figure when it serializes it.
+
+
+class Built:
+
+    def __init__(self, figure, rows):
+        self.figure = figure
+        self.rows = rows
+        self.bytes = len(figure.to_json())
+
+
+def render(build, df, max_points=0, max_bars=0):
+    # max_points / max_bars of 0 build the full-resolution figure.
+    resample = charts.RESAMPLE.get(build)
+    if resample is None or not (max_points and max_bars):
+        return Built(build(df), len(df))
+    shown, freq = resample.apply(df, max_points, max_bars)
+    return Built(downsample.retitle(build(shown), freq), len(shown))
+
+
+class FigureCache:
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._group = singleflight.Group()
+
+    def get(self, build, df, max_points=0, max_bars=0):
+        # Returns (Built, hit). Sessions asking for the same cold figure share one build.
+        key = (build.__module__, build.__qualname__, max_points, max_bars, compact.fingerprint(df))
+        with self._lock:
+            built = self._entries.get(key)
+            if built is not None:
+                self._entries.move_to_end(key)
+                return built, True
+
+        def run():
+            built = render(build, df, max_points, max_bars)
+            with self._lock:
+                self._entries[key] = built
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return built
+        return self._group.do(key, run), False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Crash-safe files for the local stores. Everything is written under a temporary name next to its target and renamed
+# into place, so a reader (or the next run after a crash) sees either the old or the new file, never a partial one.
+# Stores shared by several processes serialise their writers with locked() (flock; a no-op where fcntl is missing).
+
+
+class Directory:
+    # Base of the local stores: everything they persist lives under `root`.
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+
+@contextmanager
+def locked(path, exclusive=True):
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def tmp_path(path):
+    return f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+
+def write_atomic(path, write):
+    tmp = tmp_path(path)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        remove_quietly(tmp)
+        raise
+
+
+def write_json(path, obj):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+    write_atomic(path, write)
+
+
+def read_json(path):
+    # None when the file does not exist (yet).
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_parquet(path, frame, **kwargs):
+    write_atomic(path, lambda tmp: frame.to_parquet(tmp, index=False, **kwargs))
+
+
+def write_npy(path, array):
+    # Through a file object: np.save would append ".npy" to the temporary name.
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+    write_atomic(path, write)
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
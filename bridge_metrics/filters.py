@@ -0,0 +1,99 @@
+import pandas as pd
+
+from bridge_metrics import quantiles, sketches, transforms
+
+# Sidebar date-range / token filters, applied to the cached panel datasets (live or snapshot) without touching the
+# warehouse. Ranges are inclusive calendar days. Frames come back in the shape the unfiltered panels have, so the
+# chart builders are shared.
+
+
+def date_bounds(daily_flows):
+    if daily_flows.empty:
+        today = pd.Timestamp.today().normalize()
+        return today, today
+    day = pd.to_datetime(daily_flows["DAY"])
+    return day.min(), day.max()
+
+
+def _in_range(day, start, end):
+    day = pd.to_datetime(day)
+    return ((day >= pd.Timestamp(start)) & (day <= pd.Timestamp(end))).to_numpy()
+
+
+# --- Row 1 ----------------------------------------------------------------------------------------------------------
+def data_over_time(df, start, end, tokens):
+    # TVL is a running total over the whole history, so a range only selects which days are shown.
+    return df[_in_range(df["DAY"], start, end) & df["TOKEN"].isin(tokens).to_numpy()].reset_index(drop=True)
+
+
+# --- Row 2 ----------------------------------------------------------------------------------------------------------
+# Both modes keep the weeks overlapping the range whole, so the Row 2 charts show the same weeks either way.
+def _whole_weeks(start, end):
+    first_week, last_week = transforms.week_start(pd.Series([pd.Timestamp(start), pd.Timestamp(end)]))
+    return first_week, last_week + pd.Timedelta(days=6)
+
+
+def weekly_activity(weekly, weekly_by_token, start, end, tokens, all_tokens):
+    # With every token selected the exact all-token weekly frame is used; otherwise per-token rows are summed, which
+    # counts a wallet using two selected tokens twice in USERS.
+    first_week, _ = _whole_weeks(start, end)
+    if set(tokens) >= set(all_tokens):
+        df = weekly
+    else:
+        df = (
+            weekly_by_token[weekly_by_token["TOKEN"].isin(tokens)]
+            .groupby(["WEEK", "ACTION_TYPE"], as_index=False)[["USERS", "EVENTS", "VOLUME"]].sum()
+        )
+    return df[_in_range(df["WEEK"], first_week, end)].reset_index(drop=True)
+
+
+def weekly_activity_sketched(daily_sketches, daily_flows, start, end, tokens):
+    # Unique users / events merged from the day sketches of the selected weeks and tokens (a wallet using two selected
+    # tokens counts once); volume summed from the daily flow aggregates.
+    start, end = _whole_weeks(start, end)
+    counts = sketches.distinct_counts(daily_sketches, "W", start, end, tokens)
+    flows = daily_flows[_in_range(daily_flows["DAY"], start, end) & daily_flows["TOKEN"].isin(tokens).to_numpy()]
+    volume = (
+        flows.assign(WEEK=transforms.period_start(flows["DAY"], "W"), ACTION_TYPE=flows["DIRECTION"])
+        .groupby(["WEEK", "ACTION_TYPE"], as_index=False)["VOLUME"].sum()
+    )
+    return counts.merge(volume, on=["WEEK", "ACTION_TYPE"], how="outer").fillna({"USERS": 0, "EVENTS": 0})
+
+
+# --- Rows 3 & 4 -----------------------------------------------------------------------------------------------------
+def deposit_flows(daily_flows, start, end, tokens):
+    selected = _in_range(daily_flows["DAY"], start, end) & daily_flows["TOKEN"].isin(tokens).to_numpy()
+    return daily_flows[selected & (daily_flows["DIRECTION"] == "Deposit").to_numpy()]
+
+
+def deposit_stats(daily_flows, start, end, tokens, all_time, daily_quantiles=None):
+    # Average and count merge exactly across partitions. The median does not: without the per-day quantile sketches
+    # it stays the all-time value.
+    flows = deposit_flows(daily_flows, start, end, tokens)
+    count, volume = int(flows["EVENTS"].sum()), float(flows["VOLUME"].sum())
+    if daily_quantiles is None:
+        median = all_time["Median Deposit Size USD"].to_numpy()[:1]
+    else:
+        median = [int(round(deposit_percentiles(daily_quantiles, start, end, tokens, [0.5]).fillna(0)[0.5]))]
+    return pd.DataFrame({
+        "Avg Deposit Size USD": [int(round(volume / count)) if count else 0],
+        "Median Deposit Size USD": median,
+        "Total Deposits": [count],
+    })
+
+
+def deposit_percentiles(daily_quantiles, start, end, tokens, qs=(0.5, 0.9, 0.99)):
+    return quantiles.quantiles(daily_quantiles, qs, start, end, tokens, direction="Deposit")
+
+
+def deposit_distribution(daily_flows, start, end, tokens):
+    counts = deposit_flows(daily_flows, start, end, tokens).groupby("DEPOSIT_SIZE")["EVENTS"].sum()
+    counts = counts.reindex(transforms.DEPOSIT_SIZE_LABELS).dropna()
+    counts = counts[counts > 0].astype("int64")
+    return pd.DataFrame({"DEPOSIT_SIZE": counts.index.astype(str), "DEPOSITS": counts.to_numpy()})
+
+
+# --- Row 6 ----------------------------------------------------------------------------------------------------------
+def new_depositors_over_time(df, start, end):
+    # A wallet's first deposit is over all tokens and all time; the range only selects which days are shown.
+    return df[_in_range(df["DAY"], start, end)].reset_index(drop=True)
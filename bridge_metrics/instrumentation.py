@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Timing hooks for the hot path: warehouse queries, loaders (with loader cache hit/miss) and chart rendering.
+#
+# Every event is kept in a bounded in-process ring buffer (for the sidebar panel), logged as one JSON line on the
+# "bridge_metrics.instrumentation" logger, and folded into cumulative counters that render as Prometheus text
+# exposition (sidebar panel, or a node-exporter textfile collector file).
+
+log = logging.getLogger("bridge_metrics.instrumentation")
+
+_local = threading.local()
+
+
+class Recorder:
+
+    def __init__(self, maxlen=500):
+        self._events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._sums = defaultdict(float)
+        self._counts = defaultdict(int)
+        self._gauges = {}
+
+    def record(self, kind, name, **fields):
+        event = {"ts": time.time(), "kind": kind, "name": name, **fields}
+        with self._lock:
+            self._events.append(event)
+            labels = (kind, name, fields.get("cache", ""))
+            self._counts[labels] += 1
+            for field in ("seconds", "rows", "bytes"):
+                if fields.get(field) is not None:
+                    self._sums[labels + (field,)] += fields[field]
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(event, default=str))
+        return event
+
+    def gauge(self, metric, value, help_text, name):
+        # Last value wins, e.g. the current size of a dataset; rendered as bridge_metrics_<metric>{name=...}.
+        with self._lock:
+            self._gauges[(metric, name)] = (value, help_text)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def prometheus(self):
+        with self._lock:
+            counts = dict(self._counts)
+            sums = dict(self._sums)
+            gauges = dict(self._gauges)
+        lines = [
+            "# HELP bridge_metrics_events_total Instrumented events by kind, name and cache result.",
+            "# TYPE bridge_metrics_events_total counter",
+        ]
+        for (kind, name, cache), count in sorted(counts.items()):
+            lines.append(f'bridge_metrics_events_total{{{_labels(kind, name, cache)}}} {count}')
+        for field, unit in (("seconds", "seconds"), ("rows", "rows"), ("bytes", "bytes")):
+            metric = f"bridge_metrics_{unit}_total"
+            lines.append(f"# HELP {metric} Cumulative {unit} by kind, name and cache result.")
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, name, cache, f), value in sorted(sums.items()):
+                if f == field:
+                    lines.append(f"{metric}{{{_labels(kind, name, cache)}}} {value:g}")
+        for metric in sorted({m for m, _ in gauges}):
+            series = sorted((name, v) for (m, name), v in gauges.items() if m == metric)
+            lines.append(f"# HELP bridge_metrics_{metric} {series[0][1][1]}")
+            lines.append(f"# TYPE bridge_metrics_{metric} gauge")
+            for name, (value, _) in series:
+                lines.append(f'bridge_metrics_{metric}{{name="{_escape(name)}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(kind, name, cache):
+    labels = f'kind="{kind}",name="{_escape(name)}"'
+    return f'{labels},cache="{cache}"' if cache else labels
+
+
+RECORDER = Recorder()
+
+
+# --- Queries --------------------------------------------------------------------------------------------------------
+@contextmanager
+def timed_query(engine, query):
+    # Yields a stats dict for fetch.fetch_frame to fill (warehouse query id, rows, Arrow bytes). Engines without
+    # query ids get a local one so events can still be correlated in the log.
+    # Queries are named after the loader running them; the SQL itself (cohort queries inline wallet addresses) is
+    # only kept, shortened, on the event.
+    stats = {"query_id": None, "rows": None, "bytes": None}
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        RECORDER.record(
+            "query", getattr(_local, "loader", None) or "adhoc",
+            engine=engine,
+            sql=" ".join(query.split())[:80],
+            seconds=time.perf_counter() - start,
+            **{**stats, "query_id": stats["query_id"] or str(uuid.uuid4())}
+        )
+
+
+# --- Loaders --------------------------------------------------------------------------------------------------------
+def traced(fn):
+    # Goes directly under @singleflight.cached: the body only runs on a miss or a background revalidation, which is
+    # how misses are told apart.
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        misses = getattr(_local, "misses", None)
+        if misses is not None:
+            misses.add(fn.__name__)
+        outer = getattr(_local, "loader", None)
+        _local.loader = fn.__name__
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.loader = outer
+            RECORDER.record("compute", fn.__name__, seconds=time.perf_counter() - start, cache="miss")
+    return wrapper
+
+
+def call_loader(loader, *args):
+    # Times one loader request end to end and labels it hit or miss depending on whether its body ran.
+    previous = getattr(_local, "misses", None)
+    _local.misses = set()
+    start = time.perf_counter()
+    try:
+        return loader(*args)
+    finally:
+        cache = "miss" if loader.__name__ in _local.misses else "hit"
+        RECORDER.record("loader", loader.__name__, seconds=time.perf_counter() - start, cache=cache)
+        _local.misses = previous
+
+
+# --- Sections & Charts ----------------------------------------------------------------------------------------------
+@contextmanager
+def span(kind, name, **fields):
+    # The yielded dict can be filled in by the caller; it is recorded with the event.
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        RECORDER.record(kind, name, seconds=time.perf_counter() - start, **fields)
+
+
+# --- Export ---------------------------------------------------------------------------------------------------------
+_json_log_paths = set()
+
+
+def enable_json_log(path):
+    # Appends every event as one JSON line to `path`; safe to call on every rerun.
+    if path in _json_log_paths:
+        return
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    _json_log_paths.add(path)
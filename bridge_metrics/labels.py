@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from bridge_metrics import compact, files, queries
+
+# Local index of the CEX / bridge labelled addresses in DIM_LABELS, so depositor classification runs against a sorted
+# array instead of re-running the label subqueries inside every warehouse query.
+#
+#   <root>/<label type>-<generation>.npy   sorted, de-duplicated 20-byte addresses (numpy "S20"), memory-mapped on load
+#   <root>/meta.json                       {"generation", "refreshed_at", "counts": {<label type>: n}}
+#   <root>/lock                            flock()ed exclusive by a rebuild, shared by readers loading the files
+#
+# meta.json is the commit record: a rebuild writes every array under the next generation first and then swaps
+# meta.json, so a reader (or the next run after a crash) never pairs arrays of one build with the meta of another.
+# The previous generation is removed afterwards; processes that have it mapped keep reading it.
+#
+# Labels change rarely, so the index has its own refresh interval independent of the dashboard loaders.
+
+LABEL_TYPES = ("cex", "bridge")
+
+
+def address_bytes(addresses):
+    # '0x' + 40 hex chars (either case) -> 20 raw bytes; anything else is zeroed and flagged invalid.
+    return compact.hex_bytes(addresses, 20)
+
+
+class LabelIndex(files.Directory):
+
+    def __init__(self, root=None):
+        self.root = root
+        self._lock = threading.Lock()
+        self._arrays = None
+        self._meta = None
+
+    # --- State ----------------------------------------------------------------------------------------------------
+    def _locked(self, exclusive=True):
+        os.makedirs(self.root, exist_ok=True)
+        return files.locked(self._path("lock"), exclusive)
+
+    def _file(self, label_type, generation):
+        return self._path(f"{label_type}-{generation}.npy")
+
+    def _read_meta(self):
+        # None before the first build, and for an index written before meta.json carried a generation.
+        meta = files.read_json(self._path("meta.json"))
+        return meta if meta and "generation" in meta else None
+
+    def _sync(self):
+        meta = self._read_meta()
+        if meta is None or meta == self._meta:
+            return
+        self._arrays = {t: np.load(self._file(t, meta["generation"]), mmap_mode="r") for t in LABEL_TYPES}
+        self._meta = meta
+
+    def _load(self):
+        if self._arrays is not None or self.root is None:
+            return
+        with self._locked(exclusive=False):
+            self._sync()
+
+    def refreshed_at(self):
+        self._load()
+        return self._meta["refreshed_at"] if self._meta else None
+
+    # --- Refresh --------------------------------------------------------------------------------------------------
+    def build(self, labels):
+        # `labels` has ADDRESS and LABEL_TYPE columns (queries.LABELS_QUERY).
+        arrays = {}
+        for label_type in LABEL_TYPES:
+            packed, valid = address_bytes(labels.loc[labels["LABEL_TYPE"] == label_type, "ADDRESS"])
+            arrays[label_type] = np.unique(packed[valid])
+        previous = self._meta["generation"] if self._meta else None
+        meta = {
+            "generation": (previous or 0) + 1,
+            "refreshed_at": time.time(),
+            "counts": {t: len(a) for t, a in arrays.items()},
+        }
+
+        if self.root is not None:
+            for label_type, array in arrays.items():
+                files.write_npy(self._file(label_type, meta["generation"]), array)
+            files.write_json(self._path("meta.json"), meta)
+            for label_type in LABEL_TYPES:
+                files.remove_quietly(self._file(label_type, previous) if previous else self._path(f"{label_type}.npy"))
+
+        self._arrays, self._meta = arrays, meta
+
+    def refresh(self, read_sql, ttl=24 * 60 * 60):
+        # Decided under the lock from what is on disk: another process may have rebuilt the index meanwhile.
+        with self._lock, self._locked() if self.root is not None else nullcontext():
+            if self.root is not None:
+                self._sync()
+            if self._meta is None or time.time() - self._meta["refreshed_at"] >= ttl:
+                self.build(read_sql(queries.LABELS_QUERY))
+        return self
+
+    # --- Lookup ---------------------------------------------------------------------------------------------------
+    def contains(self, label_type, addresses):
+        # Vectorised membership: one searchsorted over the sorted label array for the whole batch.
+        self._load()
+        labelled = self._arrays[label_type]
+        packed, valid = address_bytes(addresses)
+        if not len(labelled):
+            return np.zeros(len(packed), dtype=bool)
+        pos = np.searchsorted(labelled, packed).clip(max=len(labelled) - 1)
+        return valid & (labelled[pos] == packed)
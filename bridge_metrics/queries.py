@@ -0,0 +1,208 @@
+import re
+
+import pandas as pd
+
+from bridge_metrics import registry
+
+# --- Builders -------------------------------------------------------------------------------------------------------
+# Address predicates are generated from bridge_metrics.registry as exact / IN matches on the lower-case columns.
+def _quote(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _in(column, values):
+    values = list(dict.fromkeys(values))
+    if len(values) == 1:
+        return f"{column} = {_quote(values[0])}"
+    return f"{column} in ({', '.join(_quote(v) for v in values)})"
+
+
+def _case(column, mapping, default=None):
+    whens = "\n".join(f"      when {column} = {_quote(k)} then {_quote(v)}" for k, v in mapping.items())
+    otherwise = f"\n      else {_quote(default)}" if default is not None else ""
+    return f"CASE\n{whens}{otherwise}\n  END"
+
+
+# --- Bridge Transfers ---------------------------------------------------------------------------------------------------
+# One scan of all Hyperliquid bridge contracts. Every bridge panel is derived from this frame locally.
+# With `since_block` only rows at or past the watermark block are returned; the store drops the re-read duplicates.
+#
+# The first two predicates are plain IN lists the warehouse can prune on; the last keeps each bridge paired with its
+# own token contract, exactly as the per-contract branches did.
+def bridge_transfers_query(since_block=None, bridges=None):
+    bridges = registry.BRIDGES if bridges is None else bridges
+    addresses = [b["bridge"] for b in bridges]
+    pairs = "\n  OR ".join(
+        f"(contract_address = {_quote(b['token_contract'])} "
+        f"AND (to_address = {_quote(b['bridge'])} OR from_address = {_quote(b['bridge'])}))"
+        for b in bridges
+    )
+    watermark = "" if since_block is None else f"\nAND block_number >= {int(since_block)}"
+    return f"""
+SELECT
+  block_number,
+  block_timestamp,
+  event_index,
+  date(block_timestamp) as day,
+  {_case("contract_address", {b["token_contract"]: b["token"] for b in bridges})} as token,
+  CASE
+      when {_in("to_address", addresses)} then 'Deposit'
+      else 'Withdraw'
+  END as direction,
+  CASE
+      when direction = 'Deposit' then from_address
+      else to_address
+  END as user_address,
+  tx_hash,
+  amount
+
+FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+WHERE {_in("contract_address", [b["token_contract"] for b in bridges])}
+AND ({_in("to_address", addresses)} OR {_in("from_address", addresses)})
+AND (
+  {pairs}
+){watermark}
+"""
+
+
+BRIDGE_TRANSFERS_QUERY = bridge_transfers_query()
+
+# --- Stablecoin Supply --------------------------------------------------------------------------------------------------
+# Per-day, per-symbol net mint deltas for the local supply ledger (supply.SupplyLedger), which keeps the running
+# totals. With `since_day` only that day and later are scanned; the ledger replaces its rows from that day on. Every
+# transfer of the tracked contracts yields a row (0 for plain transfers), as the original supply query did, so a
+# symbol counts towards a day's total exactly when it moved that day.
+def stablecoin_supply_deltas_query(since_day=None):
+    since = "" if since_day is None else f"\n  AND block_timestamp >= '{pd.Timestamp(since_day):%Y-%m-%d}'"
+    return f"""
+SELECT
+  date(block_timestamp) as day,
+  symbol,
+  sum(case when from_address = {_quote(registry.ZERO_ADDRESS)} then amount
+      when to_address = {_quote(registry.ZERO_ADDRESS)} then -amount else 0 end) as net_mint
+
+from ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+where {_in("contract_address", registry.STABLECOINS)}{since}
+GROUP BY 1, 2
+"""
+
+
+# --- 30 Day Depositor Cohort --------------------------------------------------------------------------------------------
+# Rows 7 and 8 used to rebuild the per-wallet first-deposit table from the bridge contracts inside the warehouse.
+# The cohort is now computed locally from the bridge extract and uploaded with the query as a temporary table
+# (backends read_sql(..., tables=...)); an inline VALUES list of every cohort wallet outgrew the statement size limit.
+COHORT_TABLE = "depositor_cohort"
+
+
+def cohort_table(cohort):
+    return pd.DataFrame({
+        "USER1": cohort["USER1"].astype(str),
+        "FIRST_DEPOSIT_DAY": pd.to_datetime(cohort["FIRST_DEPOSIT_DAY"]),
+        "DEPOSIT_VOLUME": cohort["DEPOSIT_VOLUME"].astype("float64"),
+    })
+
+
+_COHORT = f"SELECT user1, first_deposit_day, deposit_volume FROM {COHORT_TABLE}"
+
+
+ARBITRUM_USE_GROUP_QUERY = f"""
+    with tab1 as (
+  {_COHORT}
+), tab2 as (
+  SELECT
+    FROM_address as user2,
+    min(block_timestamp) as first_arb_transaction
+  FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.FACT_TRANSACTIONS
+  WHERE from_address in (SELECT user1 from tab1)
+  GROUP BY 1
+)
+SELECT
+  CASE when ABS(DATEDIFF(hour, first_arb_transaction, first_deposit_day)) <= 24
+       then 'Deposit Wallet'
+       else 'Arbitrum User Wallet'
+  end as wallet_type,
+  count(*) as wallets,
+  avg(deposit_volume) as avg_user_deposit_volume,
+  median(deposit_volume) as median_user_deposit_volume
+FROM tab1
+  LEFT outer JOIN tab2
+    on user1 = user2
+GROUP BY 1
+    """
+
+
+# Pre-deposit activity: distinct (wallet, sender) pairs inside each wallet's window around its first deposit day, with
+# no label lookups; the senders are classified locally against labels.LabelIndex. The window is the exact equivalent
+# of the original ABS(DATEDIFF(hour, first_deposit_day, t)) <= 24: DATEDIFF counts hour boundaries, so it holds from
+# 24h before the day until just before 25h after it. The lower bound on block_timestamp is a literal so the
+# warehouse can prune to the cohort period before joining.
+def pre_deposit_senders_query(cohort):
+    since = (cohort["FIRST_DEPOSIT_DAY"].min() - pd.Timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")
+    return f"""
+    with tab1 as (
+  {_COHORT}
+)
+SELECT DISTINCT
+  user1,
+  from_address,
+  'token' as source
+FROM tab1
+  JOIN ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_TOKEN_TRANSFERS
+    on user1 = to_address
+    and block_timestamp >= DATEADD(hour, -24, first_deposit_day)
+    and block_timestamp < DATEADD(hour, 25, first_deposit_day)
+WHERE block_timestamp >= '{since}'::timestamp
+UNION
+SELECT DISTINCT
+  user1,
+  from_address,
+  'native' as source
+FROM tab1
+  JOIN ARBITRUM_ONCHAIN_CORE_DATA.CORE.EZ_NATIVE_TRANSFERS
+    on user1 = to_address
+    and block_timestamp >= DATEADD(hour, -24, first_deposit_day)
+    and block_timestamp < DATEADD(hour, 25, first_deposit_day)
+WHERE block_timestamp >= '{since}'::timestamp
+    """
+
+
+# --- Labels ---------------------------------------------------------------------------------------------------------
+# Source of labels.LabelIndex.
+LABELS_QUERY = """
+SELECT DISTINCT
+  lower(address) as address,
+  label_type
+FROM ARBITRUM_ONCHAIN_CORE_DATA.CORE.DIM_LABELS
+WHERE label_type in ('cex', 'bridge')
+"""
+
+
+# --- Query History --------------------------------------------------------------------------------------------------
+# Timing breakdown for queries the dashboard already ran (instrumentation panel). QUERY_HISTORY is an INFORMATION_SCHEMA
+# table function, so any database works. It could reach back seven days; the lookup asks only for queries that ended
+# in the last day, the span of the recent events the panel shows, which keeps the function's scan small.
+_QUERY_ID_RE = re.compile(r"^[0-9a-f-]{36}$")
+
+
+def query_history_query(query_ids):
+    query_ids = [q for q in query_ids if q and _QUERY_ID_RE.match(q)]
+    if not query_ids:
+        raise ValueError("No warehouse query ids to look up")
+    ids = ", ".join(f"'{q}'" for q in query_ids)
+    return f"""
+SELECT
+  query_id,
+  start_time,
+  total_elapsed_time,
+  queued_provisioning_time + queued_repair_time + queued_overload_time as queued_ms,
+  compilation_time as compile_ms,
+  execution_time as execute_ms,
+  bytes_scanned,
+  rows_produced,
+  percentage_scanned_from_cache
+FROM TABLE(ARBITRUM_ONCHAIN_CORE_DATA.INFORMATION_SCHEMA.QUERY_HISTORY(
+  END_TIME_RANGE_START => DATEADD(day, -1, CURRENT_TIMESTAMP()),
+  RESULT_LIMIT => 10000
+))
+WHERE query_id in ({ids})
+    """
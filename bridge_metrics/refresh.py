@@ -0,0 +1,107 @@
+"""Refresh worker: runs every dashboard dataset on a schedule and publishes them as one snapshot.
+
+    python -m bridge_metrics.refresh                 # loop every BRIDGE_METRICS_REFRESH_TTL seconds
+    python -m bridge_metrics.refresh --once          # one snapshot, then exit (cron / k8s CronJob)
+
+Uses the same settings as the page (BRIDGE_METRICS_BACKEND, BRIDGE_METRICS_DATA_DIR, ...). Snowflake credentials are
+read from the [snowflake] table of the Streamlit secrets file. The page serves the latest snapshot and never queries
+the warehouse itself while one exists (see settings.SNAPSHOTS).
+"""
+import argparse
+import logging
+import sys
+import time
+
+from bridge_metrics import (
+    aggregates, backends, compact, connection, datasets, depositors, instrumentation, labels, quantiles, settings,
+    sketches, snapshots, store, supply
+)
+
+log = logging.getLogger("bridge_metrics.refresh")
+
+
+def _read_secrets(path):
+    try:
+        import tomllib
+    except ImportError:
+        import toml
+
+        with open(path) as f:
+            return toml.load(f)
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def make_backend(secrets_path):
+    if settings.BACKEND == "duckdb":
+        return backends.DuckDBBackend(settings.FIXTURES_DIR)
+    return backends.SnowflakeBackend(connection.snowflake_pool(_read_secrets(secrets_path)["snowflake"]))
+
+
+def refresh_once(
+    backend, snapshot_store, transfer_store, label_index, monthly_flows, supply_ledger, sketch_store, quantile_store,
+    depositor_index
+):
+    start = time.perf_counter()
+    read_sql = backend.read_sql
+    transfer_store.refresh(read_sql)
+    transfers = transfer_store.transfers()
+    label_index.refresh(read_sql, ttl=settings.LABELS_TTL)
+    frames = datasets.build_all(
+        read_sql, transfers, daily=transfer_store.daily(), label_index=label_index,
+        monthly=monthly_flows, ledger=supply_ledger, sketch_store=sketch_store,
+        quantile_store=quantile_store, depositor_index=depositor_index
+    )
+    version = snapshot_store.publish(frames)
+    # What every page process holds per snapshot, for sizing: the datasets are shared by all of its sessions. Page
+    # processes that build their own panels (no snapshots) hold the extract as well.
+    log.info(
+        "published snapshot %s in %.1fs, %.1f MiB in memory, extract %.1f MiB", version, time.perf_counter() - start,
+        sum(compact.footprint(f) for f in frames.values()) / 2**20, compact.footprint(transfers) / 2**20
+    )
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="publish one snapshot and exit")
+    parser.add_argument("--interval", type=int, default=settings.REFRESH_TTL, help="seconds between snapshots")
+    parser.add_argument("--secrets", default=".streamlit/secrets.toml", help="Streamlit secrets file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    # Per-query timing events go to BRIDGE_METRICS_EVENT_LOG / METRICS_FILE, not the worker's own log.
+    instrumentation.log.setLevel(logging.WARNING)
+    if settings.EVENT_LOG:
+        instrumentation.enable_json_log(settings.EVENT_LOG)
+
+    backend = make_backend(args.secrets)
+    snapshot_store = snapshots.SnapshotStore(settings.data_path("snapshots"), keep=settings.SNAPSHOTS_KEEP)
+    transfer_store = store.TransferStore(settings.data_path("bridge_transfers"))
+    label_index = labels.LabelIndex(settings.data_path("labels"))
+    monthly_flows = aggregates.MonthlyFlows(settings.data_path("monthly_flows"))
+    supply_ledger = supply.SupplyLedger(settings.data_path("stablecoin_supply"))
+    sketch_store = sketches.DailySketches(settings.data_path("sketches"))
+    quantile_store = quantiles.DailyQuantiles(settings.data_path("quantiles"))
+    depositor_index = depositors.DepositorIndex(settings.data_path("depositors"))
+
+    while True:
+        started = time.monotonic()
+        try:
+            refresh_once(
+                backend, snapshot_store, transfer_store, label_index, monthly_flows, supply_ledger, sketch_store,
+                quantile_store, depositor_index
+            )
+        except Exception:
+            # A failed round leaves the previous snapshot in place; the next round retries from the same watermark.
+            if args.once:
+                raise
+            log.exception("refresh failed")
+        if settings.METRICS_FILE:
+            instrumentation.RECORDER.write_textfile(settings.METRICS_FILE)
+        if args.once:
+            return 0
+        time.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
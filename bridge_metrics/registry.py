@@ -0,0 +1,35 @@
+import re
+
+# Contracts the queries are built from (see queries.py). Addresses are written as published (checksummed) and
+# lower-cased here once, because the warehouse stores them lower-case and only exact / IN matches on the raw column
+# can be pruned.
+#
+# Adding a Hyperliquid bridge contract is one BRIDGES line; it joins the existing single scan of EZ_TOKEN_TRANSFERS.
+
+_ADDRESS_RE = re.compile(r"^0x[0-9a-f]{40}$")
+
+
+def address(value):
+    value = value.lower()
+    if not _ADDRESS_RE.match(value):
+        raise ValueError(f"Not an EVM address: {value!r}")
+    return value
+
+
+# Hyperliquid bridge contract -> the token contract it moves, and the token name shown on the dashboard.
+BRIDGES = [
+    {"bridge": address("0xC67E9Efdb8a66A4B91b1f3731C75F500130373A4"),
+     "token_contract": address("0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8"), "token": "USDC.e"},
+    {"bridge": address("0x2Df1c51E09aECF9cacB7bc98cB1742757f163dF7"),
+     "token_contract": address("0xaf88d065e77c8cC2239327C5EDb3A432268e5831"), "token": "USDC"},
+]
+
+# Stablecoins whose Arbitrum supply is the denominator of the "% of stablecoins in Hyperliquid" chart.
+STABLECOINS = [
+    address("0xaf88d065e77c8cC2239327C5EDb3A432268e5831"),  # USDC
+    address("0xFd086bC7CD5C481DCC9C85ebE478A1C0b69FCbb9"),  # USDT
+    address("0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8"),  # USDC.e
+    address("0xda10009cbd5d07dd0cecc66161fc93d7c9000da1"),  # DAI
+]
+
+ZERO_ADDRESS = address("0x0000000000000000000000000000000000000000")
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+from bridge_metrics import compact, files, instrumentation
+
+# Disk-backed query result cache shared by every process pointed at the same directory (replicas, restarts, the
+# refresh worker). The singleflight loader cache still sits in front of it per process; this layer is what keeps a
+# cold process from going back to the warehouse.
+#
+#   <root>/<sha256>.parquet   one zstd-compressed result per normalised query + parameters
+#   <root>/index.json         {key: {"dataset", "created", "used", "bytes"}}
+#   <root>/.lock              flock()ed shared for lookups, exclusive for index updates
+#   <root>/locks/<0..63>      one of FLIGHT_LOCKS files, picked by key, held while one process runs a missing query;
+#                             others wait, then read its result
+#
+# Entries expire by the TTL of the dataset asking for them and are evicted least recently used first once the
+# directory grows past `max_bytes`.
+
+# A fixed pool rather than a file per key, so the directory does not grow with every query ever run. Unrelated misses
+# that share a lock file run one after the other; with 64 of them that is rare.
+FLIGHT_LOCKS = 64
+
+_SQL_TOKENS_RE = re.compile(r"('(?:[^']|'')*')|(?:\s|--[^\n]*)+")
+
+
+def normalize_sql(query):
+    # Whitespace and `--` comments never change a result; string literals are kept verbatim.
+    return _SQL_TOKENS_RE.sub(lambda m: m.group(1) or " ", query).strip()
+
+
+def cache_key(query, params=None, tables=None):
+    # Frames uploaded with the query (backends read_sql(..., tables=...)) are part of it, by content.
+    payload = [normalize_sql(query), params]
+    if tables:
+        payload.append({name: compact.fingerprint(frame) for name, frame in tables.items()})
+    payload = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache(files.Directory):
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    # --- Locking --------------------------------------------------------------------------------------------------
+    def _locked(self, exclusive):
+        return files.locked(self._path(".lock"), exclusive)
+
+    def _flight(self, key):
+        # Cross-process single flight: the first process to miss runs the query, the rest block here and then find
+        # the entry it stored.
+        os.makedirs(self._path("locks"), exist_ok=True)
+        return files.locked(self._path("locks", str(int(key[:8], 16) % FLIGHT_LOCKS)))
+
+    def _read_index(self):
+        try:
+            return files.read_json(self._path("index.json")) or {}
+        except json.JSONDecodeError:
+            return {}
+
+    def _write_index(self, index):
+        files.write_json(self._path("index.json"), index)
+
+    # --- Entries --------------------------------------------------------------------------------------------------
+    def get(self, key, ttl):
+        with self._locked(exclusive=False):
+            entry = self._read_index().get(key)
+            if entry is None or time.time() - entry["created"] >= ttl:
+                return None
+            try:
+                frame = pd.read_parquet(self._path(f"{key}.parquet"))
+            except FileNotFoundError:
+                return None
+        # Recency only matters for eviction, so it is bumped at most once a minute per entry.
+        if time.time() - entry["used"] >= 60:
+            with self._locked(exclusive=True):
+                index = self._read_index()
+                if key in index:
+                    index[key]["used"] = time.time()
+                    self._write_index(index)
+        return frame
+
+    def put(self, key, frame, dataset=None):
+        path = self._path(f"{key}.parquet")
+        tmp = files.tmp_path(path)
+        frame.to_parquet(tmp, index=False, compression="zstd")
+        size = os.path.getsize(tmp)
+        with self._locked(exclusive=True):
+            os.replace(tmp, path)
+            index = self._read_index()
+            now = time.time()
+            index[key] = {"dataset": dataset, "created": now, "used": now, "bytes": size}
+            self._evict(index, keep=key)
+            self._write_index(index)
+
+    def _evict(self, index, keep):
+        total = sum(entry["bytes"] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            files.remove_quietly(self._path(f"{key}.parquet"))
+            total -= entry["bytes"]
+            del index[key]
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for key in self._read_index():
+                files.remove_quietly(self._path(f"{key}.parquet"))
+            self._write_index({})
+
+    # --- Queries --------------------------------------------------------------------------------------------------
+    def read_sql(self, read_sql, query, ttl, dataset=None, params=None, tables=None):
+        key = cache_key(query, params, tables)
+        frame = self.get(key, ttl)
+        if frame is None:
+            with self._flight(key):
+                frame = self.get(key, ttl)
+                if frame is None:
+                    instrumentation.RECORDER.record("result_cache", dataset or "adhoc", cache="miss")
+                    frame = read_sql(query, tables=tables) if tables else read_sql(query)
+                    self.put(key, frame, dataset)
+                    return frame
+        instrumentation.RECORDER.record("result_cache", dataset or "adhoc", cache="hit")
+        return frame
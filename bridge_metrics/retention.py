@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# Depositor cohort retention over the bridge extract. A wallet's cohort is the week (Monday) or month of its first
+# deposit; it counts as retained in a later period when it has any bridge deposit or withdrawal in it.
+#
+# Wallets are integer-coded once and periods numbered consecutively, so the whole cohort x period matrix is one hash
+# de-duplication of (wallet, period) pairs and one bincount; no per-cohort query or groupby. Age 0 holds every
+# wallet of the cohort (its first deposit is in it), so it doubles as the cohort size.
+
+PERIODS = {"W": "Weekly", "M": "Monthly"}
+COLUMNS = ["PERIOD", "COHORT", "AGE", "WALLETS", "COHORT_SIZE", "RETENTION"]
+
+
+def period_numbers(day, freq):
+    days = pd.to_datetime(day).to_numpy().astype("datetime64[D]")
+    if freq == "M":
+        return days.astype("datetime64[M]").astype("int64")
+    # 1970-01-01 was a Thursday: shifting by 3 days makes every week start on a Monday.
+    return (days.astype("int64") + 3) // 7
+
+
+def period_starts(numbers, freq):
+    numbers = np.asarray(numbers, dtype="int64")
+    if freq == "M":
+        days = numbers.astype("datetime64[M]").astype("datetime64[D]")
+    else:
+        days = (numbers * 7 - 3).astype("datetime64[D]")
+    return pd.to_datetime(days.astype("datetime64[ns]"))
+
+
+def retention_matrix(code, wallets, period, deposit):
+    # `code`: wallet number (0..wallets-1) of every event, `period`: its period number, `deposit`: whether it is a
+    # deposit. Returns (cohort period numbers, cohort x age wallet counts); ages past the last period stay 0.
+    if not deposit.any():
+        return np.zeros(0, dtype="int64"), np.zeros((0, 0), dtype="int64")
+    # Events before the first deposit period belong to no cohort; left in, their negative offsets would spill into
+    # the previous wallet's codes below.
+    base = period[deposit].min()
+    kept = period >= base
+    code, period, deposit = code[kept], period[kept] - base, deposit[kept]
+    n = int(period.max() + 1)
+
+    first = np.full(wallets, n, dtype="int64")
+    np.minimum.at(first, code[deposit], period[deposit])
+
+    pairs = pd.unique(code * n + period)
+    cohort = first[pairs // n]
+    age = pairs % n - cohort
+    kept = (cohort < n) & (age >= 0)
+    cells = np.bincount(cohort[kept] * n + age[kept], minlength=n * n).reshape(n, n)
+    return np.arange(n) + base, cells
+
+
+def cohort_retention(transfers, freqs=tuple(PERIODS)):
+    # Long frame of the matrix per period length: one row per cohort and age up to the last period, empty cohorts left
+    # out. Wallets are coded once for all of them.
+    code, wallets = pd.factorize(transfers["USER_ADDRESS"])
+    code = code.astype("int64")
+    deposit = (transfers["DIRECTION"] == "Deposit").to_numpy()
+    return pd.concat([
+        _frame(freq, *retention_matrix(code, len(wallets), period_numbers(transfers["DAY"], freq), deposit))
+        for freq in freqs
+    ], ignore_index=True)
+
+
+def _frame(freq, periods, cells):
+    n = len(periods)
+    cohort, age = np.divmod(np.arange(n * n), n)
+    size = cells[:, 0][cohort] if n else cohort
+    observed = (cohort + age < n) & (size > 0)
+    wallets, size = cells.ravel()[observed], size[observed]
+    return pd.DataFrame({
+        "PERIOD": freq,
+        "COHORT": period_starts(periods[cohort[observed]], freq),
+        "AGE": age[observed],
+        "WALLETS": wallets,
+        "COHORT_SIZE": size,
+        "RETENTION": np.round(100 * wallets / np.maximum(size, 1), 1),
+    }, columns=COLUMNS)
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from bridge_metrics import instrumentation
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = get_script_run_ctx = None
+
+# Submits every loader up front so the warehouse round-trips overlap. Sections then ask for their result in page
+# order: the page is only ever waiting on the section it is about to draw, never on the slowest query overall.
+# Once the page run is over (shutdown), results are no longer taken from its futures: a section fragment rerunning
+# on its own calls the loader directly and gets whatever the loader cache holds now.
+
+
+class LoaderScheduler:
+
+    def __init__(self, max_workers=8):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loader")
+        self._futures = {}
+        self._closed = False
+        self._ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def _run(self, loader, args):
+        # Loaders reach Streamlit caches (st.cache_resource stores), which expect the session's script context on the
+        # calling thread.
+        if self._ctx is not None:
+            add_script_run_ctx(ctx=self._ctx)
+        return instrumentation.call_loader(loader, *args)
+
+    def submit(self, loader, *args):
+        key = loader.__name__
+        if key not in self._futures:
+            self._futures[key] = self._executor.submit(self._run, loader, args)
+        return self._futures[key]
+
+    def result(self, loader):
+        if self._closed:
+            return instrumentation.call_loader(loader)
+        future = self._futures.get(loader.__name__)
+        if future is None:
+            future = self.submit(loader)
+        # Time the page actually spent blocked on this loader (zero when it finished while earlier sections drew).
+        with instrumentation.span("wait", loader.__name__):
+            return future.result()
+
+    def shutdown(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
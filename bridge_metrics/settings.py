@@ -0,0 +1,79 @@
+import os
+
+
+def _seconds_by_name(variable, defaults=None):
+    # "name=seconds,name=seconds" -> {name: seconds}, on top of `defaults`.
+    return {
+        **(defaults or {}),
+        **{
+            name.strip(): int(seconds)
+            for name, seconds in (item.split("=") for item in os.environ.get(variable, "").split(",") if item.strip())
+        }
+    }
+
+
+# Local working directory for persisted extracts and aggregates. Point every replica at the same path to share it;
+# writers to the transfer store and result cache take file locks, so replicas and the refresh worker can run together.
+DATA_DIR = os.environ.get("BRIDGE_METRICS_DATA_DIR", ".data")
+
+# How often the bridge extract is topped up from the warehouse (seconds).
+REFRESH_TTL = int(os.environ.get("BRIDGE_METRICS_REFRESH_TTL", 15 * 60))
+
+# How long an expired loader result keeps being served while a single background refresh replaces it (seconds).
+STALE_TTL = int(os.environ.get("BRIDGE_METRICS_STALE_TTL", 60 * 60))
+
+# How often the CEX / bridge label index is rebuilt from DIM_LABELS (seconds).
+LABELS_TTL = int(os.environ.get("BRIDGE_METRICS_LABELS_TTL", 24 * 60 * 60))
+
+# Disk result cache shared by every process on DATA_DIR. Per-dataset TTLs (seconds) override REFRESH_TTL, written as
+# "stablecoin_supply=3600,cohort=900"; the size bound evicts least recently used results first.
+RESULT_CACHE = os.environ.get("BRIDGE_METRICS_RESULT_CACHE", "1") == "1"
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("BRIDGE_METRICS_RESULT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+RESULT_CACHE_TTLS = _seconds_by_name("BRIDGE_METRICS_RESULT_CACHE_TTLS")
+
+# Query backend for the loaders: "snowflake" (live warehouse) or "duckdb" (local Parquet fixtures / snapshots).
+BACKEND = os.environ.get("BRIDGE_METRICS_BACKEND", "snowflake")
+FIXTURES_DIR = os.environ.get("BRIDGE_METRICS_FIXTURES_DIR", "fixtures")
+
+# Snapshots published by the refresh worker: "auto" serves the latest one when it exists and falls back to running
+# the loaders in the page otherwise; "1" only ever serves snapshots; "0" ignores them.
+SNAPSHOTS = os.environ.get("BRIDGE_METRICS_SNAPSHOTS", "auto")
+SNAPSHOTS_KEEP = int(os.environ.get("BRIDGE_METRICS_SNAPSHOTS_KEEP", 5))
+
+# Instrumentation: "1" shows the timing panel in the sidebar for every session (otherwise append ?debug=1 to the URL).
+# EVENT_LOG appends every timing event as a JSON line; METRICS_FILE is rewritten with Prometheus text after each run.
+INSTRUMENTATION = os.environ.get("BRIDGE_METRICS_INSTRUMENTATION", "0") == "1"
+EVENT_LOG = os.environ.get("BRIDGE_METRICS_EVENT_LOG")
+METRICS_FILE = os.environ.get("BRIDGE_METRICS_METRICS_FILE")
+
+# Long daily charts are resampled before they are sent to the browser: lines down to CHART_MAX_POINTS points (LTTB),
+# bars re-binned to weeks or months once the range on screen has more than CHART_MAX_BARS days. "0" disables both.
+CHART_MAX_POINTS = int(os.environ.get("BRIDGE_METRICS_CHART_MAX_POINTS", 600))
+CHART_MAX_BARS = int(os.environ.get("BRIDGE_METRICS_CHART_MAX_BARS", 180))
+
+# Weekly users / events of a filtered view: "sketch" merges per-day HyperLogLog sketches (any date range / token
+# selection, ~2% error, see bridge_metrics.sketches); "exact" counts distinct wallets and transactions per week and
+# token from the extract. The unfiltered view always shows the exact weekly counts.
+DISTINCT_COUNTS = os.environ.get("BRIDGE_METRICS_DISTINCT_COUNTS", "sketch")
+
+# Deposit-size median / percentiles: "sketch" merges per-day quantile sketches (any date range / token selection,
+# within 1%, see bridge_metrics.quantiles); "exact" keeps the all-time median computed from the extract.
+QUANTILES = os.environ.get("BRIDGE_METRICS_QUANTILES", "sketch")
+
+# Built figures kept per process (least recently used dropped first), keyed by chart and input data fingerprint.
+FIGURE_CACHE_ENTRIES = int(os.environ.get("BRIDGE_METRICS_FIGURE_CACHE_ENTRIES", 256))
+
+# How often each page section reruns on its own to pick up fresh data (seconds, 0 = only on a full page rerun),
+# written like RESULT_CACHE_TTLS: "past_30_days=1800,depositor_metrics=0".
+SECTION_REFRESH = _seconds_by_name("BRIDGE_METRICS_SECTION_REFRESH", {
+    "bridge_flows": REFRESH_TTL,
+    "deposits_withdraws": REFRESH_TTL,
+    "depositor_metrics": 24 * 60 * 60,
+    "depositor_retention": 24 * 60 * 60,
+    "past_30_days": 60 * 60,
+})
+
+
+def data_path(*parts):
+    # Everything persisted is kept per backend, so fixtures and the live warehouse never mix.
+    return os.path.join(DATA_DIR, BACKEND, *parts)
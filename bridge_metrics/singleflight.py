@@ -0,0 +1,124 @@
+import threading
+import time
+from functools import wraps
+
+# Coalescing for the dashboard loaders. Concurrent callers of the same key share one execution (single flight), and
+# an entry past its TTL keeps being served for `stale_ttl` more seconds while one background call refreshes it
+# (stale-while-revalidate), so a cache expiry under load costs one query instead of one per session.
+#
+# Values are shared between sessions as-is rather than copied the way st.cache_data does; callers must not mutate
+# them.
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Group:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class StaleWhileRevalidate:
+
+    def __init__(self, ttl, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+        self._group = Group()
+
+    def _load(self, key, load):
+        def run():
+            value = load()
+            with self._lock:
+                self._entries[key] = (value, time.monotonic())
+            return value
+        return self._group.do(key, run)
+
+    def _revalidate(self, key, load):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._load(key, load)
+            except Exception:
+                pass  # keep serving the stale value; the next caller past the stale window loads synchronously
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="revalidate", daemon=True).start()
+
+    def get(self, key, load):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            value, stored = entry
+            age = time.monotonic() - stored
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._revalidate(key, load)
+                return value
+        return self._load(key, load)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Streamlit re-executes the page script on every rerun, which re-creates decorated functions; caches are therefore
+# kept per module + qualified name so every rerun and session lands on the same one.
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def cached(ttl, stale_ttl=0):
+    def decorator(fn):
+        name = (fn.__module__, fn.__qualname__)
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None or (cache.ttl, cache.stale_ttl) != (ttl, stale_ttl):
+                cache = _caches[name] = StaleWhileRevalidate(ttl, stale_ttl)
+
+        @wraps(fn)
+        def wrapper(*args):
+            return cache.get(args, lambda: fn(*args))
+
+        wrapper.clear = cache.clear
+        return wrapper
+    return decorator
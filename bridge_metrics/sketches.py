@@ -0,0 +1,216 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import compact, files, transforms
+
+# HyperLogLog distinct-count sketches of the bridge extract, one USERS (USER_ADDRESS) and one EVENTS (TX_HASH) sketch
+# per DAY x TOKEN x ACTION_TYPE. Sketches merge by taking the register-wise maximum, so unique users / events for any
+# granularity, date range or token selection come from merging the day sketches it covers, in milliseconds.
+#
+# Error bounds (PRECISION = 11, 2048 one-byte registers, 2 KiB per sketch):
+#   - relative standard error 1.04 / sqrt(2048) = 2.3%, i.e. within +-4.6% for ~95% of estimates;
+#   - below ~5,000 distinct values (2.5 x registers) linear counting is used, which does better on small counts:
+#     about +-2 at 100, 1.7% standard error at 1,000, exact for a handful of values.
+#
+# The extract holds addresses and hashes as fixed-width bytes (transforms.compact_transfers); they are hashed 8 bytes
+# at a time with pandas' 64-bit integer mix, chained, which depends on nothing but the bytes, so sketches built in
+# different processes (page, refresh worker) merge.
+# Sketch frames are plain DataFrames with the registers as bytes columns, so they are published in snapshots like any
+# other dataset. Exact counts stay available (settings.DISTINCT_COUNTS = "exact").
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+KEY = ["DAY", "TOKEN", "ACTION_TYPE"]
+COUNTS = {"USERS": "USER_ADDRESS", "EVENTS": "TX_HASH"}
+PERIOD_COLUMNS = {"D": "DAY", "W": "WEEK", "M": "MONTH"}
+
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+_INVERSE_POWERS = np.exp2(-np.arange(256, dtype="float64"))
+
+
+# --- Registers ------------------------------------------------------------------------------------------------------
+def _bit_length(x):
+    # frexp is exact on each 32-bit half, and its exponent is the bit length (0 for 0).
+    hi = np.frexp((x >> np.uint64(32)).astype("float64"))[1]
+    lo = np.frexp((x & np.uint64(0xFFFFFFFF)).astype("float64"))[1]
+    return np.where(hi > 0, hi + 32, lo)
+
+
+def _hash_bytes(packed):
+    width = packed.dtype.itemsize
+    words = np.zeros((len(packed), -(-width // 8) * 8), dtype="uint8")
+    words[:, :width] = np.ascontiguousarray(packed).view("uint8").reshape(-1, width)
+    words = words.view("uint64")
+    hashes = np.zeros(len(packed), dtype="uint64")
+    for i in range(words.shape[1]):
+        hashes = pd.util.hash_array(hashes ^ words[:, i])
+    return hashes
+
+
+def _ranks(values):
+    # Register index (top PRECISION bits) and rank (position of the first set bit in the rest) of every value.
+    hashes = _hash_bytes(compact.fixed_bytes(values))
+    index = (hashes >> np.uint64(64 - PRECISION)).astype("int64")
+    rest = hashes & np.uint64((1 << (64 - PRECISION)) - 1)
+    return index, ((64 - PRECISION) + 1 - _bit_length(rest)).astype("uint8")
+
+
+def registers(frame, column):
+    # Compacted frames (see compact) hold the registers in one Arrow fixed_size_binary buffer, viewed without a copy.
+    values = frame[column].array
+    if isinstance(values, pd.arrays.ArrowExtensionArray):
+        chunks = values.__arrow_array__().combine_chunks()
+        start = chunks.offset * REGISTERS
+        flat = np.frombuffer(chunks.buffers()[1], dtype="uint8")[start:start + len(chunks) * REGISTERS]
+        return flat.reshape(-1, REGISTERS)
+    return np.frombuffer(b"".join(values), dtype="uint8").reshape(-1, REGISTERS)
+
+
+def estimate(regs):
+    # Distinct-count estimate for every row of an (n, REGISTERS) register array.
+    regs = np.atleast_2d(regs)
+    raw = _ALPHA * REGISTERS * REGISTERS / _INVERSE_POWERS[regs].sum(axis=1)
+    zeros = (regs == 0).sum(axis=1)
+    linear = REGISTERS * np.log(REGISTERS / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * REGISTERS) & (zeros > 0), linear, raw)
+
+
+def _merge_rows(regs, groups, n):
+    # Register-wise maximum of the rows of each group, groups numbered 0..n-1. One vectorized pass per position within
+    # a group (at most the days in a period x tokens), each over whole contiguous rows; ufunc.at / reduceat along
+    # axis 0 are an order of magnitude slower here.
+    out = np.zeros((n, REGISTERS), dtype="uint8")
+    if len(groups):
+        order = np.argsort(groups, kind="stable")
+        ordered = groups[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        position = np.arange(len(ordered)) - np.repeat(starts, np.diff(np.r_[starts, len(ordered)]))
+        for k in range(position.max() + 1):
+            at = position == k
+            rows = ordered[at]
+            out[rows] = np.maximum(out[rows], regs[order[at]])
+    return out
+
+
+def _frame(keys, regs):
+    return keys.reset_index(drop=True).assign(**{
+        column: [row.tobytes() for row in regs[column]] for column in COUNTS
+    })
+
+
+# --- Build / Merge --------------------------------------------------------------------------------------------------
+def sketch(transfers):
+    if transfers.empty:
+        return pd.DataFrame(columns=[*KEY, *COUNTS])
+    rows = transfers.assign(ACTION_TYPE=transfers["DIRECTION"])
+    grouped = rows.groupby(KEY, sort=True, observed=True)
+    groups = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[KEY]
+
+    regs = {}
+    for column, source in COUNTS.items():
+        index, rank = _ranks(rows[source])
+        flat = np.zeros(len(keys) * REGISTERS, dtype="uint8")
+        np.maximum.at(flat, groups * REGISTERS + index, rank)
+        regs[column] = flat.reshape(-1, REGISTERS)
+    return _frame(keys, regs)
+
+
+def merge(*frames):
+    # Union of sketch frames: rows with the same key are merged register-wise.
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame(columns=[*KEY, *COUNTS])
+    both = pd.concat(frames, ignore_index=True)
+    grouped = both.groupby(KEY, sort=True, observed=True)
+    groups = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[KEY]
+    return _frame(keys, {column: _merge_rows(registers(both, column), groups, len(keys)) for column in COUNTS})
+
+
+# --- Queries --------------------------------------------------------------------------------------------------------
+def distinct_counts(frame, freq="W", start=None, end=None, tokens=None):
+    # Unique USERS / EVENTS per period ("D", "W" or "M") and ACTION_TYPE over the selected days and tokens.
+    period = PERIOD_COLUMNS[freq]
+    if frame is None or frame.empty:
+        return pd.DataFrame({
+            period: pd.Series(dtype="datetime64[ns]"), "ACTION_TYPE": pd.Series(dtype="str"),
+            **{column: pd.Series(dtype="int64") for column in COUNTS},
+        })
+    day = pd.to_datetime(frame["DAY"])
+    selected = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        selected &= (day >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        selected &= (day <= pd.Timestamp(end)).to_numpy()
+    if tokens is not None:
+        selected &= frame["TOKEN"].isin(tokens).to_numpy()
+    frame = frame[selected]
+
+    keys = pd.DataFrame({period: transforms.period_start(day[selected], freq), "ACTION_TYPE": frame["ACTION_TYPE"]})
+    grouped = keys.groupby([period, "ACTION_TYPE"], sort=True, observed=True)
+    groups = grouped.ngroup().to_numpy()
+    out = grouped.size().reset_index()[[period, "ACTION_TYPE"]]
+    for column in COUNTS:
+        merged = _merge_rows(registers(frame, column), groups, len(out))
+        out[column] = np.rint(estimate(merged)).astype("int64")
+    return out
+
+
+# --- Store ----------------------------------------------------------------------------------------------------------
+class DailySketches(files.Directory):
+    # <root>/<NAME>-<rows>.parquet plus meta.json {"rows": <extract rows folded in>, "version"}. The transfer store only
+    # ever appends (and drops re-read duplicates), so each update folds in just the rows past the stored count.
+    #
+    # Like the depositor index, each update writes a new file named by its row count and then swaps meta.json, so the
+    # frame a reader loads always matches the row count it resumes from; an update interrupted before the swap is
+    # redone from the previous file, never folded in twice (which would double quantile counts). A store written with
+    # another VERSION (sketches of the hex strings, before the extract held raw bytes) is rebuilt.
+
+    NAME = "sketches"
+    VERSION = 2
+    build = staticmethod(sketch)
+    combine = staticmethod(merge)
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._frame = None
+        self._rows = 0
+
+    def _file(self, rows):
+        return self._path(f"{self.NAME}-{rows}.parquet")
+
+    def read(self):
+        if self._frame is None:
+            meta = files.read_json(self._path("meta.json"))
+            if meta is None or meta.get("version", 1) != self.VERSION:
+                return None
+            try:
+                self._frame = pd.read_parquet(self._file(meta["rows"]))
+            except FileNotFoundError:
+                return None
+            self._rows = meta["rows"]
+        return self._frame
+
+    def update(self, transfers):
+        with self._lock:
+            stored = self.read()
+            if stored is not None and self._rows <= len(transfers):
+                if self._rows == len(transfers):
+                    return 0
+                frame = self.combine(stored, self.build(transfers.iloc[self._rows:]))
+            else:
+                frame = self.build(transfers)
+
+            os.makedirs(self.root, exist_ok=True)
+            files.write_parquet(self._file(len(transfers)), frame)
+            files.write_json(self._path("meta.json"), {"rows": len(transfers), "version": self.VERSION})
+            if stored is not None:
+                files.remove_quietly(self._file(self._rows))
+            added = len(transfers) - (self._rows if stored is not None else 0)
+            self._frame, self._rows = frame, len(transfers)
+            return added
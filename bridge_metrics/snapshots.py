@@ -0,0 +1,85 @@
+import os
+import shutil
+import time
+
+from bridge_metrics import compact, files
+
+# Versioned dataset snapshots published by the refresh worker (python -m bridge_metrics.refresh) and read by the page.
+#
+#   <root>/<version>/<dataset>.arrow     one uncompressed Arrow IPC file per datasets.PANELS entry
+#   <root>/<version>/manifest.json       {"version", "created", "datasets": {name: rows}, "bytes": {name: in memory}}
+#   <root>/LATEST                        name of the newest complete version
+#
+# A version is written under a temporary name and renamed into place before LATEST is swapped, so readers only ever
+# see complete snapshots. The last `keep` versions stay on disk, so a page that resolved LATEST just before a publish
+# can still read the version it resolved.
+#
+# Readers memory-map the IPC files (compact.read_ipc), so every page process on a host shares one copy of a version
+# in the OS page cache and resident memory no longer grows with the number of processes. Files are never modified
+# after the rename, readers take no locks, and pruning a version a process still maps only unlinks it: the pages stay
+# valid until that process drops its frames. Versions published as parquet before the switch stay readable.
+
+
+class SnapshotStore(files.Directory):
+
+    def __init__(self, root, keep=5):
+        self.root = root
+        self.keep = keep
+
+    # --- Read -----------------------------------------------------------------------------------------------------
+    def latest(self):
+        try:
+            with open(self._path("LATEST")) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version if os.path.isdir(self._path(version)) else None
+
+    def manifest(self, version):
+        return files.read_json(self._path(version, "manifest.json"))
+
+    def read(self, version, dataset):
+        path = self._path(version, f"{dataset}.arrow")
+        if os.path.exists(path):
+            return compact.read_ipc(path, dataset)
+        return compact.read_parquet(self._path(version, f"{dataset}.parquet"), dataset)
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            v for v in os.listdir(self.root)
+            if not v.startswith(".") and os.path.isfile(self._path(v, "manifest.json"))
+        )
+
+    # --- Publish --------------------------------------------------------------------------------------------------
+    def publish(self, frames):
+        created = time.time()
+        version = time.strftime("%Y%m%dT%H%M%S", time.gmtime(created)) + f"-{int(created * 1e6) % 1_000_000:06d}"
+        tmp = self._path(f".tmp-{version}-{os.getpid()}")
+        os.makedirs(tmp)
+        try:
+            for name, frame in frames.items():
+                compact.write_ipc(frame, os.path.join(tmp, f"{name}.arrow"))
+            manifest = {
+                "version": version, "created": created, "datasets": {n: len(f) for n, f in frames.items()},
+                "bytes": {n: compact.footprint(f) for n, f in frames.items()},
+            }
+            files.write_json(os.path.join(tmp, "manifest.json"), manifest)
+            os.rename(tmp, self._path(version))
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        files.write_atomic(self._path("LATEST"), lambda p: _write_text(p, version))
+        self.prune()
+        return version
+
+    def prune(self):
+        for version in self.versions()[:-self.keep]:
+            shutil.rmtree(self._path(version), ignore_errors=True)
+
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
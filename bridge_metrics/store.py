@@ -0,0 +1,187 @@
+import glob
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from bridge_metrics import compact, files, queries, transforms
+
+# Local append-only store of bridge transfers, keyed by block number.
+#
+#   <root>/transfers/part-<first block>-<last block>-<generation>.parquet   one file per refresh, never rewritten
+#   <root>/daily-<generation>.parquet       DAY x TOKEN net deposits with running TVL
+#   <root>/meta.json                        {"generation", "watermark": <last block fetched>, "parts": [...], "daily",
+#                                            "days": [<first day>, <last day>]}
+#   <root>/lock                             flock()ed exclusive by writers, shared by readers loading the files
+#
+# A refresh asks the warehouse only for rows at or past the watermark block, drops the rows it already stores, and
+# folds the remainder into the daily aggregates.
+#
+# meta.json is the commit record: data files are written first under new names, then meta.json is swapped to list
+# them, and only the files it lists are ever read. A crash in between leaves unlisted files that the next write
+# removes. Processes sharing the directory (replicas, the refresh worker) take the lock and re-read meta.json before
+# fetching, so none of them appends from a stale watermark. Once there are more than MAX_PARTS parts, the next
+# refresh rewrites them as one.
+
+KEY = ["TX_HASH", "EVENT_INDEX"]
+MAX_PARTS = 64
+
+
+class TransferStore(files.Directory):
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._meta = None
+        self._parts = {}
+        self._transfers = None
+        self._daily = None
+
+    # --- State ----------------------------------------------------------------------------------------------------
+    @contextmanager
+    def _locked(self, exclusive=True):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, files.locked(self._path("lock"), exclusive):
+            yield
+
+    def _read_meta(self):
+        meta = files.read_json(self._path("meta.json"))
+        if meta is None:
+            return {"generation": 0, "watermark": None, "parts": [], "daily": None}
+        if "parts" not in meta:
+            # Written before meta.json listed the committed files: every part on disk was committed.
+            parts = sorted(glob.glob(self._path("transfers", "part-*.parquet")))
+            daily = "daily.parquet" if os.path.exists(self._path("daily.parquet")) else None
+            meta = {"generation": 0, **meta, "parts": [os.path.basename(p) for p in parts], "daily": daily}
+        return meta
+
+    def _sync(self):
+        # Load the committed state, reusing the parts already in memory; another process may have appended.
+        meta = self._read_meta()
+        if meta == self._meta:
+            return
+        parts = {
+            name: self._parts[name] if name in self._parts else _read_part(self._path("transfers", name))
+            for name in meta["parts"]
+        }
+        if meta["daily"] != (self._meta or {}).get("daily") or self._daily is None:
+            self._daily = pd.read_parquet(self._path(meta["daily"])) if meta["daily"] else None
+        self._parts, self._meta = parts, meta
+        self._transfers = (
+            pd.concat(list(parts.values()), ignore_index=True) if parts else transforms.empty_transfers()
+        )
+        compact.record("bridge_transfers", self._transfers)
+
+    def _load(self):
+        if self._meta is None:
+            with self._locked(exclusive=False):
+                self._sync()
+
+    def transfers(self):
+        self._load()
+        return self._transfers
+
+    def daily(self):
+        self._load()
+        return self._daily
+
+    def days(self):
+        # First and last stored day (YYYY-MM-DD), or None. Read off meta.json without the lock, which is swapped
+        # atomically, so it never waits for a refresh in flight.
+        return (files.read_json(self._path("meta.json")) or {}).get("days")
+
+    # --- Refresh --------------------------------------------------------------------------------------------------
+    def append(self, new):
+        with self._locked():
+            self._sync()
+            return self._append(new)
+
+    def refresh(self, read_sql):
+        with self._locked():
+            self._sync()
+            new = transforms.prepare_transfers(read_sql(queries.bridge_transfers_query(self._meta["watermark"])))
+            return self._append(new)
+
+    def _append(self, new):
+        watermark, stored = self._meta["watermark"], self._transfers
+        if watermark is not None and len(new):
+            # Every stored row from the watermark on (or from the first new block, for rows fetched from an older one).
+            since = min(watermark, int(new["BLOCK_NUMBER"].min()))
+            seen = stored.loc[stored["BLOCK_NUMBER"].to_numpy() >= since, KEY]
+            if len(seen):
+                dup = pd.MultiIndex.from_frame(new[KEY]).isin(pd.MultiIndex.from_frame(seen))
+                new = new[~dup]
+        if not len(new):
+            return 0
+
+        new = new.reset_index(drop=True)
+        generation = self._meta["generation"] + 1
+        transfers = pd.concat([stored, new], ignore_index=True) if len(stored) else new
+        if len(self._parts) >= MAX_PARTS:
+            parts = {_part_name(transfers, generation): transfers}
+        else:
+            parts = {**self._parts, _part_name(new, generation): new}
+        daily = update_daily(self._daily, new)
+
+        os.makedirs(self._path("transfers"), exist_ok=True)
+        for name, frame in parts.items():
+            if name not in self._parts:
+                files.write_parquet(self._path("transfers", name), frame)
+        files.write_parquet(self._path(f"daily-{generation:06d}.parquet"), daily)
+        meta = {
+            "generation": generation,
+            "watermark": max(int(new["BLOCK_NUMBER"].max()), watermark if watermark is not None else 0),
+            "parts": list(parts),
+            "daily": f"daily-{generation:06d}.parquet",
+            "days": [f"{daily['DAY'].min():%Y-%m-%d}", f"{daily['DAY'].max():%Y-%m-%d}"],
+        }
+        files.write_json(self._path("meta.json"), meta)
+        self._parts, self._meta, self._transfers, self._daily = parts, meta, transfers, daily
+        compact.record("bridge_transfers", transfers)
+        self._collect()
+        return len(new)
+
+    def _collect(self):
+        # Files not listed in meta.json: merged parts, older daily aggregates, leftovers of an interrupted write.
+        listed = {self._path("transfers", name) for name in self._meta["parts"]} | {self._path(self._meta["daily"])}
+        for path in [
+            *glob.glob(self._path("transfers", "part-*")), *glob.glob(self._path("daily*.parquet*"))
+        ]:
+            if path not in listed:
+                files.remove_quietly(path)
+
+
+def _read_part(path):
+    # Categories as the extract defines them now (a part may predate a BRIDGES token); parts written before the extract
+    # was compacted hold plain strings, converted here.
+    return transforms.compact_transfers(compact.read_table(path))
+
+
+def _part_name(frame, generation):
+    first, last = int(frame["BLOCK_NUMBER"].min()), int(frame["BLOCK_NUMBER"].max())
+    return f"part-{first:012d}-{last:012d}-{generation:06d}.parquet"
+
+
+# --- Daily Aggregates -----------------------------------------------------------------------------------------------
+def update_daily(daily, new):
+    """Fold new transfers into DAY x TOKEN net deposits and roll the running TVL forward from the first touched day."""
+    delta = transforms.daily_net_deposits(new)[["DAY", "TOKEN", "NET_DEPOSIT"]]
+    if daily is None or daily.empty:
+        return transforms.daily_net_deposits(new).reset_index(drop=True)
+
+    merged = (
+        pd.concat([daily[["DAY", "TOKEN", "NET_DEPOSIT"]], delta], ignore_index=True)
+        .groupby(["DAY", "TOKEN"], as_index=False)["NET_DEPOSIT"].sum()
+        .sort_values(["TOKEN", "DAY"], kind="stable")
+        .reset_index(drop=True)
+    )
+    merged = merged.merge(daily[["DAY", "TOKEN", "TVL"]], on=["DAY", "TOKEN"], how="left")
+
+    # Days before the first touched day keep their stored TVL; everything after is re-accumulated from there.
+    start = merged["TOKEN"].map(delta.groupby("TOKEN")["DAY"].min())
+    redo = merged["DAY"] >= start
+    base = merged[start.notna() & ~redo].groupby("TOKEN")["TVL"].last()
+    running = merged.loc[redo].groupby("TOKEN")["NET_DEPOSIT"].cumsum()
+    merged.loc[redo, "TVL"] = merged.loc[redo, "TOKEN"].map(base).fillna(0.0) + running
+    return merged
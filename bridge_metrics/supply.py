@@ -0,0 +1,123 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from bridge_metrics import files, queries
+
+# Local daily stablecoin supply ledger behind the Row 1 TVL share.
+#
+#   <root>/ledger.parquet   DAY x SYMBOL -> NET_MINT (minted minus burned that day)
+#   <root>/meta.json        {"generation", "through": <last day fetched, YYYY-MM-DD>}
+#   <root>/lock             flock()ed exclusive by refreshes, shared by readers loading the files
+#
+# A refresh only scans the warehouse from the last stored day on (that day may have been partial when fetched) and
+# replaces those rows. Running supply per symbol and the per-day total are cumulative sums over the ledger.
+#
+# meta.json is written last. Re-fetching from an older "through" only replaces rows again, so a ledger newer than its
+# meta is harmless; a ledger without meta (a crash before the first meta write) is ignored and rebuilt from scratch.
+# Every write bumps the generation, so another process sharing the directory notices the swap and reloads the ledger
+# (a same-day refresh leaves "through" unchanged).
+
+LEDGER_COLUMNS = ["DAY", "SYMBOL", "NET_MINT"]
+SUPPLY_COLUMNS = ["D1", "STABLECOIN_SUPPY"]
+
+
+def ledger_rows(deltas):
+    df = deltas.copy()
+    df.columns = [c.upper() for c in df.columns]
+    return pd.DataFrame({
+        "DAY": pd.to_datetime(df["DAY"]).astype("datetime64[ns]"),
+        "SYMBOL": df["SYMBOL"].astype("category"),
+        "NET_MINT": pd.to_numeric(df["NET_MINT"]).astype("float64").fillna(0.0),
+    })
+
+
+def supply_over_time(ledger):
+    # Same shape and meaning as the original supply query: each symbol's running supply, summed per day over the
+    # symbols with a row that day.
+    if ledger.empty:
+        return pd.DataFrame(columns=SUPPLY_COLUMNS)
+    ledger = ledger.sort_values(["SYMBOL", "DAY"], kind="stable")
+    supply = ledger.groupby("SYMBOL", observed=True)["NET_MINT"].cumsum()
+    total = supply.groupby(ledger["DAY"].to_numpy()).sum()
+    return pd.DataFrame({"D1": total.index, "STABLECOIN_SUPPY": total.to_numpy()})
+
+
+class SupplyLedger(files.Directory):
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._meta = None
+        self._ledger = None
+
+    # --- State ----------------------------------------------------------------------------------------------------
+    @contextmanager
+    def _locked(self, exclusive=True):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, files.locked(self._path("lock"), exclusive):
+            yield
+
+    def _read_meta(self):
+        meta = files.read_json(self._path("meta.json"))
+        if meta is None or not os.path.exists(self._path("ledger.parquet")):
+            return {"generation": 0, "through": None}
+        return {"generation": 0, **meta}
+
+    def _sync(self):
+        # Reload the ledger only when meta.json has been swapped since it was read.
+        meta = self._read_meta()
+        if meta == self._meta:
+            return
+        if meta["through"] is None:
+            self._ledger = ledger_rows(pd.DataFrame(columns=LEDGER_COLUMNS))
+        else:
+            self._ledger = pd.read_parquet(self._path("ledger.parquet"))
+        self._meta = meta
+
+    def ledger(self):
+        with self._locked(exclusive=False):
+            self._sync()
+            return self._ledger
+
+    def through(self):
+        with self._locked(exclusive=False):
+            self._sync()
+            return self._meta["through"]
+
+    # --- Refresh --------------------------------------------------------------------------------------------------
+    def append(self, deltas, since=None):
+        with self._locked():
+            self._sync()
+            return self._append(deltas, since)
+
+    def refresh(self, read_sql):
+        # The fetch runs under the lock too, so two processes never both scan from the same "through".
+        with self._locked():
+            self._sync()
+            since = self._meta["through"]
+            return self._append(read_sql(queries.stablecoin_supply_deltas_query(since)), since)
+
+    def _append(self, deltas, since):
+        # Rows from `since` on (everything without it) are replaced by `deltas`.
+        new, stored = ledger_rows(deltas), self._ledger
+        if new.empty:
+            return 0
+        kept = stored.iloc[:0] if since is None else stored[stored["DAY"] < pd.Timestamp(since)]
+        ledger = (
+            pd.concat([kept, new] if len(kept) else [new], ignore_index=True)
+            .astype({"SYMBOL": "category"})
+            .sort_values(["DAY", "SYMBOL"], kind="stable")
+            .reset_index(drop=True)
+        )
+
+        files.write_parquet(self._path("ledger.parquet"), ledger)
+        meta = {"generation": self._meta["generation"] + 1, "through": f"{ledger['DAY'].max():%Y-%m-%d}"}
+        files.write_json(self._path("meta.json"), meta)
+        self._ledger, self._meta = ledger, meta
+        return len(new)
+
+    def supply(self):
+        return supply_over_time(self.ledger())
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from bridge_metrics import compact, registry
+
+# Panels derived locally from the single bridge-transfer extract (see queries.BRIDGE_TRANSFERS_QUERY).
+# Column names mirror what the old per-panel warehouse queries returned so the charts stay unchanged.
+
+DEPOSIT_SIZE_BINS = [-np.inf, 100, 1000, 10000, 100000, np.inf]
+DEPOSIT_SIZE_LABELS = ['a/ below $100', 'b/ $100 - $1K', 'c/ $1K - $10K', 'd/ $10K - $100K', 'e/ S100K+']
+
+
+# --- Extract --------------------------------------------------------------------------------------------------------
+# The extract is held compacted: TOKEN / DIRECTION as categoricals over fixed categories (so store parts concatenate
+# without falling back to strings), USER_ADDRESS / TX_HASH as 20 / 32-byte fixed_size_binary.
+TOKENS = pd.CategoricalDtype(list(dict.fromkeys(b["token"] for b in registry.BRIDGES)))
+DIRECTIONS = pd.CategoricalDtype(["Deposit", "Withdraw"])
+HEX_WIDTHS = {"USER_ADDRESS": 20, "TX_HASH": 32}
+
+# Columns of queries.BRIDGE_TRANSFERS_QUERY as fetched, for an extract that has no rows yet.
+EXTRACT_DTYPES = {
+    "BLOCK_NUMBER": "int64",
+    "BLOCK_TIMESTAMP": "datetime64[us]",
+    "EVENT_INDEX": "int64",
+    "DAY": "datetime64[ms]",
+    "TOKEN": "str",
+    "DIRECTION": "str",
+    "USER_ADDRESS": "str",
+    "TX_HASH": "str",
+    "AMOUNT": "float64",
+}
+
+
+def empty_transfers():
+    return prepare_transfers(pd.DataFrame({c: pd.Series(dtype=d) for c, d in EXTRACT_DTYPES.items()}))
+
+
+def prepare_transfers(df):
+    df = df.copy()
+    df.columns = [c.upper() for c in df.columns]
+    df["DAY"] = pd.to_datetime(df["DAY"])
+    df["AMOUNT"] = df["AMOUNT"].astype("float64")
+    return compact_transfers(df)
+
+
+def compact_transfers(df):
+    return df.assign(
+        TOKEN=df["TOKEN"].astype(TOKENS),
+        DIRECTION=df["DIRECTION"].astype(DIRECTIONS),
+        **{name: compact.hex_column(df[name], width) for name, width in HEX_WIDTHS.items()},
+    )
+
+
+def is_deposit(transfers):
+    return (transfers["DIRECTION"] == "Deposit").to_numpy()
+
+
+def deposits(transfers):
+    return transfers[is_deposit(transfers)]
+
+
+# --- Row 1 ----------------------------------------------------------------------------------------------------------
+def daily_net_deposits(transfers):
+    amount = transfers["AMOUNT"].to_numpy()
+    signed = np.where(is_deposit(transfers), amount, -amount)
+    # TOKEN back as plain strings: the store keeps this table on disk and folds new days into it (store.update_daily).
+    daily = (
+        transfers.assign(NET_DEPOSIT=signed, TOKEN=transfers["TOKEN"].astype(str))
+        .groupby(["DAY", "TOKEN"], as_index=False)["NET_DEPOSIT"].sum()
+        .sort_values(["TOKEN", "DAY"], kind="stable")
+    )
+    daily["TVL"] = daily.groupby("TOKEN")["NET_DEPOSIT"].cumsum()
+    return daily
+
+
+def data_over_time(daily, stablecoin_supply):
+    supply = stablecoin_supply.copy()
+    supply.columns = [c.upper() for c in supply.columns]
+    supply["D1"] = pd.to_datetime(supply["D1"])
+
+    df = daily.merge(supply, left_on="DAY", right_on="D1", how="left")
+    df["PERCENT_OF_SABLECOINS_IN_HYPERLIQUID"] = 100 * (df["TVL"] / df["STABLECOIN_SUPPY"].astype("float64"))
+    return df.sort_values("DAY", kind="stable").reset_index(drop=True)
+
+
+# --- Row 2 ----------------------------------------------------------------------------------------------------------
+def week_start(day):
+    # date_trunc('week', ...) in Snowflake starts weeks on Monday
+    return day - pd.to_timedelta(day.dt.dayofweek, unit="D")
+
+
+def period_start(day, freq):
+    # First day of the day ("D"), Monday week ("W") or month ("M") each day falls in.
+    day = pd.to_datetime(day).dt.normalize()
+    if freq == "W":
+        return week_start(day)
+    if freq == "M":
+        return day.dt.to_period("M").dt.start_time
+    return day
+
+
+def weekly_bridge_activity(transfers, by=()):
+    keys = ["WEEK", *by, "ACTION_TYPE"]
+    grouped = transfers.assign(WEEK=week_start(transfers["DAY"]), ACTION_TYPE=transfers["DIRECTION"]).groupby(keys)
+    return pd.DataFrame({
+        "USERS": grouped["USER_ADDRESS"].nunique(),
+        "EVENTS": grouped["TX_HASH"].nunique(),
+        "VOLUME": grouped["AMOUNT"].sum(),
+    }).reset_index()
+
+
+# --- Row 3 ----------------------------------------------------------------------------------------------------------
+def deposit_stats(transfers):
+    amount = deposits(transfers)["AMOUNT"]
+    return pd.DataFrame({
+        "Avg Deposit Size USD": [int(round(amount.mean())) if len(amount) else 0],
+        "Median Deposit Size USD": [int(round(amount.median())) if len(amount) else 0],
+        "Total Deposits": [len(amount)],
+    })
+
+
+# --- Row 4 ----------------------------------------------------------------------------------------------------------
+def deposit_distribution(transfers):
+    size = pd.cut(
+        deposits(transfers)["AMOUNT"],
+        bins=DEPOSIT_SIZE_BINS,
+        labels=DEPOSIT_SIZE_LABELS,
+        right=False
+    )
+    counts = size.value_counts(sort=False)
+    counts = counts[counts > 0]
+    return pd.DataFrame({"DEPOSIT_SIZE": counts.index.astype(str), "DEPOSITS": counts.to_numpy()})
+
+
+# --- Row 8 ----------------------------------------------------------------------------------------------------------
+PRE_DEPOSIT_BRIDGE = 'a/ Pre-Deposit Bridge'
+PRE_DEPOSIT_CEX = 'b/ Pre-Deposit Cex Transfer'
+OTHER_WALLET = 'c/ Other wallet'
+
+
+def pre_deposit_wallet_types(cohort, senders, label_index):
+    # `senders`: distinct USER1 / FROM_ADDRESS / SOURCE inflows inside each wallet's window
+    # (queries.pre_deposit_senders_query). Bridge inflows count as token or native; CEX inflows only as token transfers.
+    from_bridge = label_index.contains("bridge", senders["FROM_ADDRESS"])
+    from_cex = label_index.contains("cex", senders["FROM_ADDRESS"]) & (senders["SOURCE"] == "token").to_numpy()
+    wallets = cohort["USER1"]
+    return pd.DataFrame({
+        "USER1": wallets,
+        "DEPOSIT_VOLUME": cohort["DEPOSIT_VOLUME"],
+        "WALLET_TYPE": np.select(
+            [wallets.isin(senders["USER1"][from_bridge]), wallets.isin(senders["USER1"][from_cex])],
+            [PRE_DEPOSIT_BRIDGE, PRE_DEPOSIT_CEX],
+            OTHER_WALLET
+        ),
+    })
+
+
+def wallet_type_summary(wallet_types):
+    return (
+        wallet_types.groupby("WALLET_TYPE")["DEPOSIT_VOLUME"]
+        .agg(WALLETS="count", AVG_USER_DEPOSIT_VOLUME="mean", MEDIAN_USER_DEPOSIT_VOLUME="median")
+        .reset_index()
+    )
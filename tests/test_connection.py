@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from bridge_metrics import connection
+
+
+def _stream(pool):
+    # Same shape as SnowflakeBackend.iter_frames: the connection is held while the caller consumes rows.
+    with pool.connection() as conn:
+        yield from conn.execute("SELECT 1 UNION ALL SELECT 2")
+
+
+def _select_one(pool):
+    return pool.run(lambda conn: conn.execute("SELECT 1").fetchone())
+
+
+def test_abandoned_stream_returns_its_connection():
+    pool = connection.sqlite_pool(max_size=1, timeout=1)
+    rows = _stream(pool)
+    next(rows)
+    rows.close()
+    assert _select_one(pool) == (1,)
+    assert pool.created == 1
+
+
+def test_base_exception_returns_its_connection():
+    pool = connection.sqlite_pool(max_size=1, timeout=1)
+    with pytest.raises(KeyboardInterrupt):
+        with pool.connection():
+            raise KeyboardInterrupt
+    assert _select_one(pool) == (1,)
+    assert pool.created == 1
+
+
+def test_disconnected_connection_is_replaced():
+    pool = connection.sqlite_pool(max_size=1, timeout=1)
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.connection() as conn:
+            conn.close()
+            conn.execute("SELECT 1")
+    assert _select_one(pool) == (1,)
+    assert pool.created == 2
@@ -0,0 +1,144 @@
+import os
+import re
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from bridge_metrics import files, store, transforms
+
+
+def _rows(blocks, events=2):
+    # Raw extract rows as the warehouse returns them: `events` transfers per block, one block per hour.
+    rows = []
+    for block in blocks:
+        timestamp = pd.Timestamp("2024-01-01") + pd.Timedelta(hours=block)
+        for event in range(events):
+            rows.append({
+                "block_number": block,
+                "block_timestamp": timestamp,
+                "event_index": event,
+                "day": timestamp.floor("D"),
+                "token": ["USDC", "USDC.e"][(block + event) % 2],
+                "direction": ["Deposit", "Deposit", "Withdraw"][(block * 7 + event) % 3],
+                "user_address": f"0x{block % 11 + 1:040x}",
+                "tx_hash": f"0x{block:064x}",
+                "amount": float(block * 10 + event + 1),
+            })
+    return pd.DataFrame(rows)
+
+
+def _append(transfer_store, blocks):
+    return transfer_store.append(transforms.prepare_transfers(_rows(blocks)))
+
+
+def _read_sql(blocks):
+    # Stand-in for the warehouse: answers bridge_transfers_query with the rows at or past its watermark block.
+    def read_sql(query, tables=None):
+        since = re.search(r"block_number >= (\d+)", query)
+        return _rows([b for b in blocks if since is None or b >= int(since.group(1))])
+    return read_sql
+
+
+def _sorted_transfers(transfer_store):
+    return transfer_store.transfers().sort_values(store.KEY).reset_index(drop=True)
+
+
+def _sorted_daily(daily):
+    return daily[["DAY", "TOKEN", "NET_DEPOSIT", "TVL"]].sort_values(["TOKEN", "DAY"]).reset_index(drop=True)
+
+
+def _full_rebuild(tmp_path, blocks):
+    full = store.TransferStore(str(tmp_path / "full"))
+    _append(full, blocks)
+    return full
+
+
+def test_overlapping_refetch_is_not_double_counted(tmp_path):
+    transfer_store = store.TransferStore(str(tmp_path / "store"))
+    assert _append(transfer_store, range(0, 40)) == 80
+    # A re-fetch from an older block: only blocks 40-59 are new.
+    assert _append(transfer_store, range(30, 60)) == 40
+
+    transfers = transfer_store.transfers()
+    assert len(transfers) == 120
+    assert not transfers.duplicated(store.KEY).any()
+    pd.testing.assert_frame_equal(
+        _sorted_daily(transfer_store.daily()), _sorted_daily(_full_rebuild(tmp_path, range(0, 60)).daily())
+    )
+
+
+def test_noop_refresh_leaves_output_unchanged(tmp_path):
+    root = str(tmp_path / "store")
+    transfer_store = store.TransferStore(root)
+    assert transfer_store.refresh(_read_sql(range(0, 50))) == 100
+    transfers, daily = transfer_store.transfers(), transfer_store.daily()
+    meta, listing = files.read_json(os.path.join(root, "meta.json")), sorted(os.listdir(root))
+
+    # The warehouse has nothing new: the watermark block comes back again and is dropped.
+    assert transfer_store.refresh(_read_sql(range(0, 50))) == 0
+    assert transfer_store.transfers() is transfers
+    assert transfer_store.daily() is daily
+    assert files.read_json(os.path.join(root, "meta.json")) == meta
+    assert sorted(os.listdir(root)) == listing
+
+
+def test_incremental_matches_full_rebuild(tmp_path):
+    blocks = range(0, 200)
+    transfer_store = store.TransferStore(str(tmp_path / "store"))
+    for end in range(20, 201, 20):
+        transfer_store.refresh(_read_sql(range(0, end)))
+    full = _full_rebuild(tmp_path, blocks)
+
+    pd.testing.assert_frame_equal(_sorted_transfers(transfer_store), _sorted_transfers(full))
+    pd.testing.assert_frame_equal(_sorted_daily(transfer_store.daily()), _sorted_daily(full.daily()))
+    pd.testing.assert_frame_equal(
+        _sorted_daily(transfer_store.daily()),
+        _sorted_daily(transforms.daily_net_deposits(full.transfers())),
+    )
+
+    # A fresh process reads the same state back from disk.
+    reopened = store.TransferStore(transfer_store.root)
+    assert reopened.days() == ["2024-01-01", "2024-01-09"]
+    pd.testing.assert_frame_equal(_sorted_transfers(reopened), _sorted_transfers(full))
+    pd.testing.assert_frame_equal(_sorted_daily(reopened.daily()), _sorted_daily(full.daily()))
+
+
+def test_meta_lists_only_committed_parts(tmp_path):
+    root = str(tmp_path / "store")
+    transfer_store = store.TransferStore(root)
+    _append(transfer_store, range(0, 10))
+    committed = files.read_json(os.path.join(root, "meta.json"))
+
+    # A crash after the data files are written but before meta.json is swapped.
+    with mock.patch.object(files, "write_json", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            _append(store.TransferStore(root), range(10, 20))
+    assert len(os.listdir(os.path.join(root, "transfers"))) == 2
+
+    reopened = store.TransferStore(root)
+    assert len(reopened.transfers()) == 20
+    assert files.read_json(os.path.join(root, "meta.json")) == committed
+
+    # The next commit removes the unlisted leftovers and appends the lost rows again.
+    assert _append(reopened, range(10, 20)) == 20
+    meta = files.read_json(os.path.join(root, "meta.json"))
+    assert sorted(os.listdir(os.path.join(root, "transfers"))) == sorted(meta["parts"])
+    assert sorted(n for n in os.listdir(root) if n.startswith("daily")) == [meta["daily"]]
+    pd.testing.assert_frame_equal(_sorted_transfers(reopened), _sorted_transfers(_full_rebuild(tmp_path, range(0, 20))))
+
+
+def test_parts_are_compacted_past_max_parts(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "MAX_PARTS", 3)
+    root = str(tmp_path / "store")
+    transfer_store = store.TransferStore(root)
+    for start in range(0, 50, 10):
+        _append(transfer_store, range(start, start + 10))
+
+    # Parts 1-3 are written as they come, the 4th refresh merges everything into one, the 5th appends to it.
+    meta = files.read_json(os.path.join(root, "meta.json"))
+    assert len(meta["parts"]) == 2
+    assert sorted(os.listdir(os.path.join(root, "transfers"))) == sorted(meta["parts"])
+    pd.testing.assert_frame_equal(
+        _sorted_transfers(store.TransferStore(root)), _sorted_transfers(_full_rebuild(tmp_path, range(0, 50)))
+    )